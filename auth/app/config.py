@@ -1,6 +1,9 @@
 """
 Модуль конфигурации для приложения аутентификации.
 """
+from typing import Dict, Optional
+from jwt.algorithms import get_default_algorithms
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,9 +11,42 @@ class Settings(BaseSettings):
     Класс для хранения настроек приложения аутентификации.
     """
     DATABASE_URL: str
-    JWT_SECRET: str
+    JWT_SECRET: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION: int = 3600
+    JWT_REFRESH_EXPIRATION: int = 30 * 24 * 3600
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None
+    JWT_KEY_ID: str = "default"
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /auth/login": "10/minute",
+        "POST /auth/register": "10/minute",
+        "PUT /auth/change-password": "10/minute",
+    }
+    RATE_LIMIT_CONCURRENCY: int = 4
+    CHECK_MIGRATIONS: bool = True
+    DB_WARMUP_CONNECTIONS: int = 5
+    DB_MAX_CONNECTIONS: int = 20
+    WEB_CONCURRENCY: int = 1
+    DEBUG: bool = False
+    SLOW_QUERY_MS: int = 200
+
+    @model_validator(mode="after")
+    def check_jwt_key(self):
+        """
+        Проверяет, что алгоритм подписи JWT поддерживается и для него задан ключ:
+        `JWT_SECRET` для HS-алгоритмов, `JWT_PRIVATE_KEY_FILE` для асимметричных.
+
+        Исключения:
+            ValueError: Если алгоритм не поддерживается или ключ не задан.
+        """
+        if self.JWT_ALGORITHM not in get_default_algorithms():
+            raise ValueError(f"Неподдерживаемый алгоритм JWT: {self.JWT_ALGORITHM}")
+        if self.JWT_ALGORITHM.startswith("HS"):
+            if not self.JWT_SECRET:
+                raise ValueError(f"Для алгоритма {self.JWT_ALGORITHM} нужен JWT_SECRET")
+        elif not self.JWT_PRIVATE_KEY_FILE:
+            raise ValueError(f"Для алгоритма {self.JWT_ALGORITHM} нужен JWT_PRIVATE_KEY_FILE")
+        return self
 
     class Config:
         """
@@ -4,10 +4,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from common import db_profiling
+from common.pooling import pool_limits
 
 DATABASE_URL = settings.DATABASE_URL
+POOL_SIZE, MAX_OVERFLOW = pool_limits(settings.DB_MAX_CONNECTIONS, settings.WEB_CONCURRENCY)
 
-engine = create_async_engine(DATABASE_URL, future=True, echo=True)
+engine = create_async_engine(DATABASE_URL, future=True, echo=True,
+                             pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW)
+db_profiling.install(engine, settings.SLOW_QUERY_MS)
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -1,20 +1,55 @@
 """
 Модуль для инициализации и настройки приложения FastAPI.
 """
+import asyncio
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from sqlalchemy.future import select
+from app.config import settings
 from app.database import engine
 from app.routes import auth
-from common.models.base import Base
+from app.utils import decode_token
+from common import health
+from common.models.user import User
+from common.db_profiling import QueryStatsMiddleware
 from common.logging_config import setup_logging
+from common.rate_limit import RateLimitMiddleware
+from common.startup import check_alembic_head, warm_up_until_ready
 
 setup_logging()
 
-app = FastAPI()
+WARMUP_STATEMENTS = [
+    select(User).filter(User.username == ""),
+    select(User).filter(User.email == ""),
+    select(User).filter(User.id == 0),
+    select(User).offset(0).limit(10),
+]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Проверяет схему БД при старте, прогревает пул в фоне и закрывает пул при остановке.
+    """
+    app.state.ready = False
+    app.state.started_at = time.monotonic()
+    app.state.engine = engine
+    if settings.CHECK_MIGRATIONS:
+        await check_alembic_head(engine)
+    warmup = asyncio.create_task(
+        warm_up_until_ready(app, engine, settings.DB_WARMUP_CONNECTIONS, WARMUP_STATEMENTS)
+    )
+    yield
+    app.state.ready = False
+    warmup.cancel()
+    await engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RateLimitMiddleware,
+                   limits=settings.RATE_LIMITS,
+                   decode_token=decode_token,
+                   concurrency=settings.RATE_LIMIT_CONCURRENCY)
+app.add_middleware(QueryStatsMiddleware, headers=settings.DEBUG)
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
@@ -1,19 +1,82 @@
 """
 Модуль для аутентификации пользователей.
 """
-from typing import List
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Numeric, and_, case, cast, func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app import schemas
-from app.utils import create_access_token, hash_password, verify_password, get_db
+from app.config import settings
+from app.utils import (create_access_token, create_refresh_token, decode_cursor, encode_cursor,
+                       get_current_user, get_jwks, hash_password, hash_refresh_token,
+                       verify_password, get_db)
+from common.models.refresh_token import RefreshToken
 from common.models.user import User
+from common.money import to_minor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+INITIAL_BALANCE = Decimal("1000")
+
+# Надбавка к рейтингу пользователей, имя или email которых начинается с запроса.
+PREFIX_BOOST = 1
+
+async def issue_tokens(db: AsyncSession, user: User,
+                       family_id: Optional[str] = None) -> Tuple[dict, RefreshToken]:
+    """
+    Выпуск пары токенов доступа и обновления.
+
+    Параметры:
+    - db (AsyncSession): Сессия базы данных (фиксацию выполняет вызывающий код).
+    - user (User): Пользователь.
+    - family_id (Optional[str]): Цепочка ротации; если не задана, начинается новая.
+
+    Возвращает:
+    - Tuple[dict, RefreshToken]: Ответ с токенами и запись нового refresh-токена.
+    """
+    refresh_token, token_hash = create_refresh_token()
+    record = RefreshToken(
+        user_id=user.id,
+        token_hash=token_hash,
+        family_id=family_id or str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.JWT_REFRESH_EXPIRATION)
+    )
+    db.add(record)
+    await db.flush()
+    tokens = {
+        "access_token": create_access_token({"sub": user.username}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+    return tokens, record
+
+async def revoke_family(db: AsyncSession, family_id: str) -> None:
+    """
+    Отзыв всех действующих refresh-токенов цепочки.
+    """
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """
+    Отзыв всех действующих refresh-токенов пользователя во всех цепочках.
+    """
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
 @router.post("/register", response_model=schemas.UserResponse)
 async def register(user: schemas.UserCreate,
                    db: AsyncSession = Depends(get_db)) -> schemas.UserResponse:
@@ -54,7 +117,8 @@ async def register(user: schemas.UserCreate,
         username = user.username,
         email = user.email,
         hashed_password = hashed_password,
-        balance=1000.0
+        balance=to_minor(INITIAL_BALANCE, user.currency),
+        currency=user.currency
     )
 
     db.add(new_user)
@@ -89,9 +153,85 @@ async def login(user: schemas.UserLogin,
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                 detail="Неверное имя пользователя или пароль")
 
-        token = create_access_token({"sub": db_user.username})
+        tokens, _ = await issue_tokens(db, db_user)
         logger.info("Пользователь успешно вошел: %s", user.username)
-        return {"access_token": token, "token_type": "bearer"}
+        return tokens
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(data: schemas.RefreshRequest,
+                  db: AsyncSession = Depends(get_db)) -> schemas.Token:
+    """
+    Обновление токена доступа по refresh-токену с ротацией.
+
+    Старый refresh-токен отзывается и заменяется новым. Повторное использование
+    уже замененного токена считается утечкой: отзывается вся цепочка.
+
+    - Параметры:
+        - `data`: Объект, содержащий refresh-токен.
+
+    - Ответ:
+        - Возвращает новые токены доступа и обновления.
+
+    - Ошибки:
+        - 401: Если refresh-токен неизвестен, отозван или истек.
+    """
+    async with db.begin():
+        result = await db.execute(
+            select(RefreshToken)
+            .where(RefreshToken.token_hash == hash_refresh_token(data.refresh_token))
+            .with_for_update()
+        )
+        record = result.scalar_one_or_none()
+        if record is None or record.expires_at < datetime.utcnow():
+            logger.warning("Неизвестный или истекший refresh-токен")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail="Недействительный refresh-токен")
+
+        reused = record.revoked_at is not None
+        if reused:
+            logger.warning("Повторное использование refresh-токена, отзыв цепочки %s",
+                           record.family_id)
+            await revoke_family(db, record.family_id)
+        else:
+            user = await db.get(User, record.user_id)
+            tokens, new_record = await issue_tokens(db, user, record.family_id)
+            record.revoked_at = datetime.utcnow()
+            record.replaced_by_id = new_record.id
+
+    if reused:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Недействительный refresh-токен")
+    logger.info("Токены пользователя %s обновлены", user.username)
+    return tokens
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: schemas.RefreshRequest,
+                 db: AsyncSession = Depends(get_db)) -> None:
+    """
+    Выход: отзыв refresh-токена и всей его цепочки ротации.
+
+    - Параметры:
+        - `data`: Объект, содержащий refresh-токен.
+    """
+    result = await db.execute(
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(data.refresh_token))
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is not None:
+        await revoke_family(db, family_id)
+        await db.commit()
+        logger.info("Цепочка refresh-токенов %s отозвана", family_id)
+
+@router.get("/.well-known/jwks.json")
+async def jwks() -> dict:
+    """
+    Открытые ключи для локальной проверки токенов доступа другими сервисами.
+
+    - Ответ:
+        - JWKS; при подписи общим секретом (HS256) список ключей пуст.
+    """
+    return get_jwks()
 
 @router.put("/change-password", response_model=schemas.UserResponse)
 async def change_password(
@@ -104,7 +244,9 @@ async def change_password(
         - `data`: Объект, содержащий имя пользователя, старый и новый пароли.
 
     - Ответ:
-        - Возвращает информацию о пользователе с обновленным паролем.
+        - Возвращает информацию о пользователе с обновленным паролем. Все
+          refresh-токены пользователя отзываются в той же транзакции, поэтому
+          после смены пароля нужно войти заново на всех устройствах.
 
     - Ошибки:
         - 400: Если неверное имя пользователя, старый пароль или новый пароль 
@@ -129,9 +271,10 @@ async def change_password(
 
     db_user.hashed_password = hash_password(data.new_password)
     db.add(db_user)
+    await revoke_user_tokens(db, db_user.id)
     await db.commit()
     await db.refresh(db_user)
-    logger.info("Пароль пользователя изменен: %s", data.username)
+    logger.info("Пароль пользователя изменен, refresh-токены отозваны: %s", data.username)
     return db_user
 
 @router.get("/users", response_model=list[schemas.UserResponse])
@@ -156,6 +299,79 @@ async def get_all_users(skip: int = 0, limit: int = 10,
     logger.info("Найдено пользователей: %d", len(users))
     return users
 
+@router.get("/users/search", response_model=schemas.UserSearchPage)
+async def search_users(q: str = Query(..., min_length=3, max_length=100),
+                       limit: int = Query(20, ge=1, le=100),
+                       cursor: Optional[str] = None,
+                       current_user: User = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_db)) -> schemas.UserSearchPage:
+    """
+    Поиск пользователей по части имени или email.
+
+    Используются триграммные GIN-индексы (`pg_trgm`): находятся пользователи,
+    имя или email которых начинается с запроса, содержит его или похож на него.
+    Результаты упорядочены по убыванию рейтинга: триграммного сходства с
+    надбавкой за совпадение префикса. Пагинация по курсору, без OFFSET.
+    Запрос короче 3 символов не образует ни одной триграммы и не может быть
+    обслужен индексом, поэтому отклоняется. Доступен только по токену.
+
+    - Параметры:
+        - `q`: Строка поиска (не короче 3 символов).
+        - `token`: JWT токен доступа.
+        - `limit`: Размер страницы (по умолчанию 20, не больше 100).
+        - `cursor`: Курсор следующей страницы из предыдущего ответа.
+
+    - Ответ:
+        - Возвращает страницу пользователей и курсор следующей страницы
+          (`null` на последней странице).
+
+    - Ошибки:
+        - 400: Если курсор некорректен.
+        - 401: Если токен недействителен.
+    """
+    logger.info("Поиск пользователей %s: q=%s, limit=%d", current_user.username, q, limit)
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=str(error))
+
+    pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    prefix = f"{pattern}%"
+    score = func.round(cast(
+        func.greatest(func.similarity(User.username, q), func.similarity(User.email, q))
+        + case((or_(User.username.ilike(prefix), User.email.ilike(prefix)), PREFIX_BOOST),
+               else_=0),
+        Numeric), 4).label("score")
+    ranked = (
+        select(User.id, score)
+        .where(or_(User.username.ilike(f"%{pattern}%"), User.email.ilike(f"%{pattern}%"),
+                   User.username.op("%")(q), User.email.op("%")(q)))
+        .subquery()
+    )
+    query = (
+        select(User, ranked.c.score)
+        .join(ranked, ranked.c.id == User.id)
+        .order_by(ranked.c.score.desc(), User.id)
+        .limit(limit + 1)
+    )
+    if position is not None:
+        last_score, last_id = position
+        query = query.where(or_(
+            ranked.c.score < last_score,
+            and_(ranked.c.score == last_score, User.id > last_id),
+        ))
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].User.id)
+    logger.info("Найдено пользователей: %d", len(rows))
+    return {"items": [row.User for row in rows], "next_cursor": next_cursor}
+
 @router.get("/users/{user_id}", response_model=schemas.UserResponse)
 async def get_user(user_id: int,
                    db: AsyncSession = Depends(get_db)) -> schemas.UserResponse:
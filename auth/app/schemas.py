@@ -2,7 +2,9 @@
 Модуль для определения схем данных с использованием Pydantic.
 """
 from decimal import Decimal
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, ValidationInfo, field_validator
+from common.money import DEFAULT_CURRENCY, from_minor, validate_currency
 
 class UserCreate(BaseModel):
     """
@@ -11,6 +13,14 @@ class UserCreate(BaseModel):
     username: str
     email: EmailStr
     password: str = Field(..., min_length=8)
+    currency: str = DEFAULT_CURRENCY
+
+    @field_validator("currency")
+    def check_currency(cls, value):
+        """
+        Проверяет, что валюта счета поддерживается.
+        """
+        return validate_currency(value)
 
     @field_validator("password")
     def validate_password(cls, value):
@@ -45,21 +55,45 @@ class UserResponse(BaseModel):
     id: int
     username: str
     email: EmailStr
+    currency: str
     balance: Decimal
 
+    @field_validator("balance", mode="before")
+    def balance_from_minor_units(cls, value, info: ValidationInfo):
+        """
+        Переводит баланс из минимальных единиц валюты, в которых он хранится в БД.
+        """
+        if isinstance(value, int):
+            return from_minor(value, info.data["currency"])
+        return value
+
     class Config:
         """
         Конфигурация для модели UserResponse.
         """
         orm_mode = True
 
+class UserSearchPage(BaseModel):
+    """
+    Класс для представления страницы результатов поиска пользователей.
+    """
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
 class Token(BaseModel):
     """
     Класс для получения токена.
     """
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
+class RefreshRequest(BaseModel):
+    """
+    Класс для обновления или отзыва refresh-токена.
+    """
+    refresh_token: str
+
 class PasswordChange(BaseModel):
     """
     Класс для изменения пароля пользователя.
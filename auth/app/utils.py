@@ -2,10 +2,23 @@
 Утилиты для работы с аутентификацией и хешированием паролей.
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation
+from typing import Tuple
+import base64
+import binascii
+import hashlib
+import secrets
+from cryptography.hazmat.primitives import serialization
 from passlib.context import CryptContext
 import jwt
+from jwt.algorithms import get_default_algorithms
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from app.database import AsyncSessionLocal
 from app.config import settings
+from common.models.user import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -66,7 +79,128 @@ def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(seconds=settings.JWT_EXPIRATION)
     to_encode.update({"exp": expire})
+    headers = None if is_symmetric() else {"kid": settings.JWT_KEY_ID}
     encoded_jwt = jwt.encode(to_encode,
-                             settings.JWT_SECRET,
-                             algorithm=settings.JWT_ALGORITHM)
+                             signing_key(),
+                             algorithm=settings.JWT_ALGORITHM,
+                             headers=headers)
     return encoded_jwt
+
+async def decode_token(token: str) -> dict:
+    """
+    Проверка подписи и срока действия токена доступа.
+
+    Параметры:
+    - token (str): JWT токен.
+
+    Возвращает:
+    - dict: Содержимое токена.
+
+    Исключения:
+    - jwt.PyJWTError: Если токен недействителен или истек.
+    """
+    key = settings.JWT_SECRET if is_symmetric() else signing_key().public_key()
+    return jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
+
+async def get_current_user(token: str, db: AsyncSession = Depends(get_db)) -> User:
+    """
+    Получение текущего пользователя по токену доступа.
+
+    Параметры:
+    - token (str): JWT токен доступа.
+    - db (AsyncSession): Сессия базы данных, полученная через зависимость.
+
+    Возвращает:
+    - User: Пользователь, которому выдан токен.
+
+    Исключения:
+    - HTTPException: Если токен недействителен, истек или пользователь не найден.
+    """
+    try:
+        username = (await decode_token(token)).get("sub")
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Токен истек")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Неверный токен")
+    if username is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Неверный токен")
+
+    result = await db.execute(select(User).filter(User.username == username))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Пользователь не найден")
+    return user
+
+def is_symmetric() -> bool:
+    """
+    Проверка, что токены подписываются общим секретом (HS256 и т.п.).
+    """
+    return settings.JWT_ALGORITHM.startswith("HS")
+
+@lru_cache
+def signing_key():
+    """
+    Ключ подписи токенов.
+
+    Для HS-алгоритмов это `JWT_SECRET`, для асимметричных (RS256, EdDSA и т.п.) —
+    закрытый ключ из PEM-файла `JWT_PRIVATE_KEY_FILE`.
+    """
+    if is_symmetric():
+        return settings.JWT_SECRET
+    with open(settings.JWT_PRIVATE_KEY_FILE, "rb") as file:
+        return serialization.load_pem_private_key(file.read(), password=None)
+
+def get_jwks() -> dict:
+    """
+    Набор открытых ключей (JWKS) для проверки токенов другими сервисами.
+
+    Возвращает:
+    - dict: JWKS; для HS-алгоритмов список ключей пуст.
+    """
+    if is_symmetric():
+        return {"keys": []}
+    algorithm = get_default_algorithms()[settings.JWT_ALGORITHM]
+    jwk = algorithm.to_jwk(signing_key().public_key(), as_dict=True)
+    jwk.update({"kid": settings.JWT_KEY_ID, "alg": settings.JWT_ALGORITHM, "use": "sig"})
+    return {"keys": [jwk]}
+
+def create_refresh_token() -> Tuple[str, str]:
+    """
+    Создание непрозрачного refresh-токена.
+
+    Возвращает:
+    - Tuple[str, str]: Токен для клиента и его хеш для хранения в БД.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Хеширование refresh-токена (SHA-256).
+
+    Токен случайный и длинный, поэтому медленный хеш вроде bcrypt не нужен.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def encode_cursor(score: Decimal, user_id: int) -> str:
+    """
+    Кодирование курсора поиска пользователей (`score:id` в base64).
+    """
+    return base64.urlsafe_b64encode(f"{score}:{user_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Decimal, int]:
+    """
+    Декодирование курсора поиска пользователей.
+
+    Исключения:
+    - ValueError: Если курсор некорректен.
+    """
+    try:
+        score, _, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+        return Decimal(score), int(user_id)
+    except (binascii.Error, UnicodeDecodeError, InvalidOperation, ValueError):
+        raise ValueError("Некорректный курсор")
@@ -12,6 +12,12 @@ sys.path.insert(0, dirname(dirname(abspath(__file__))))
 from models.base import Base
 from models.user import User
 from models.transaction import Transaction
+from models.outbox import OutboxEvent, OutboxOffset
+from models.schedule import ScheduledTransfer, ScheduledTransferRun
+from models.refresh_token import RefreshToken
+from models.limit import TransferLimit
+from models.ledger import LedgerEntry
+from models.statement import StatementSummary
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -0,0 +1,37 @@
+"""Add account snapshots
+
+Revision ID: 0086043b2ab2
+Revises: 10d506d7afea
+Create Date: 2026-10-19 16:05:13.284916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0086043b2ab2'
+down_revision: Union[str, None] = '10d506d7afea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('account_snapshots',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('archived_net', sa.BigInteger(), nullable=False),
+    sa.Column('archived_count', sa.BigInteger(), nullable=False),
+    sa.Column('archived_through', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'currency')
+    )
+    op.create_index('ix_transactions_created_at', 'transactions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_created_at', table_name='transactions')
+    op.drop_table('account_snapshots')
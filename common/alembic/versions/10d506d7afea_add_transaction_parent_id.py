@@ -0,0 +1,31 @@
+"""Add transaction parent_id
+
+Revision ID: 10d506d7afea
+Revises: 461d1534d5c3
+Create Date: 2026-10-19 15:22:40.671254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10d506d7afea'
+down_revision: Union[str, None] = '461d1534d5c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('transactions_parent_id_fkey', 'transactions', 'transactions',
+                          ['parent_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_transactions_parent_id'), 'transactions', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transactions_parent_id'), table_name='transactions')
+    op.drop_constraint('transactions_parent_id_fkey', 'transactions', type_='foreignkey')
+    op.drop_column('transactions', 'parent_id')
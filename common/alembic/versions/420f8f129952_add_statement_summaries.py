@@ -0,0 +1,38 @@
+"""Add statement summaries
+
+Revision ID: 420f8f129952
+Revises: c4bb4d21fe64
+Create Date: 2026-10-19 18:02:37.118265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '420f8f129952'
+down_revision: Union[str, None] = 'c4bb4d21fe64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('statement_summaries',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('opening_balance', sa.BigInteger(), nullable=False),
+    sa.Column('closing_balance', sa.BigInteger(), nullable=False),
+    sa.Column('total_debit', sa.BigInteger(), nullable=False),
+    sa.Column('total_credit', sa.BigInteger(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('account_id', 'period_start')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('statement_summaries')
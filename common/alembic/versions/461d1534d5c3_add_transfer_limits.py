@@ -0,0 +1,40 @@
+"""Add transfer limits
+
+Revision ID: 461d1534d5c3
+Revises: dab48eb7c412
+Create Date: 2026-10-19 14:37:58.120473
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '461d1534d5c3'
+down_revision: Union[str, None] = 'dab48eb7c412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transfer_limits',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('window_seconds', sa.Integer(), nullable=False),
+    sa.Column('max_amount', sa.BigInteger(), nullable=True),
+    sa.Column('max_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'currency', 'window_seconds',
+                        name='uq_transfer_limits_user_currency_window')
+    )
+    op.create_index('ix_transactions_sender_id_created_at', 'transactions',
+                    ['sender_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_sender_id_created_at', table_name='transactions')
+    op.drop_table('transfer_limits')
@@ -0,0 +1,54 @@
+"""Store amounts in minor units
+
+Revision ID: 5b35dad89589
+Revises: 5f4d63900b68
+Create Date: 2026-10-19 11:03:52.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b35dad89589'
+down_revision: Union[str, None] = '5f4d63900b68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Все существующие суммы в рублях: 1 рубль = 100 копеек.
+SCALE = 100
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('currency', sa.String(length=3),
+                                     nullable=False, server_default='RUB'))
+    op.execute('UPDATE users SET balance = 0 WHERE balance IS NULL')
+    op.alter_column('users', 'balance',
+                    existing_type=sa.DECIMAL(),
+                    type_=sa.BigInteger(),
+                    nullable=False,
+                    postgresql_using=f'round(balance * {SCALE})::bigint')
+    op.add_column('transactions', sa.Column('currency', sa.String(length=3),
+                                            nullable=False, server_default='RUB'))
+    op.alter_column('transactions', 'amount',
+                    existing_type=sa.DECIMAL(),
+                    type_=sa.BigInteger(),
+                    existing_nullable=False,
+                    postgresql_using=f'round(amount * {SCALE})::bigint')
+
+
+def downgrade() -> None:
+    op.alter_column('transactions', 'amount',
+                    existing_type=sa.BigInteger(),
+                    type_=sa.DECIMAL(),
+                    existing_nullable=False,
+                    postgresql_using=f'amount::numeric / {SCALE}')
+    op.drop_column('transactions', 'currency')
+    op.alter_column('users', 'balance',
+                    existing_type=sa.BigInteger(),
+                    type_=sa.DECIMAL(),
+                    nullable=True,
+                    postgresql_using=f'balance::numeric / {SCALE}')
+    op.drop_column('users', 'currency')
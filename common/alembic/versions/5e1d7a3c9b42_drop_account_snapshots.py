@@ -0,0 +1,35 @@
+"""Drop account snapshots
+
+Revision ID: 5e1d7a3c9b42
+Revises: 420f8f129952
+Create Date: 2026-10-19 21:14:08.513207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d7a3c9b42'
+down_revision: Union[str, None] = '420f8f129952'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_table('account_snapshots')
+
+
+def downgrade() -> None:
+    op.create_table('account_snapshots',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('archived_net', sa.BigInteger(), nullable=False),
+    sa.Column('archived_count', sa.BigInteger(), nullable=False),
+    sa.Column('archived_through', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'currency')
+    )
@@ -0,0 +1,32 @@
+"""Add trigram indexes for user search
+
+Revision ID: 798e176c686d
+Revises: 0086043b2ab2
+Create Date: 2026-10-19 16:48:02.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '798e176c686d'
+down_revision: Union[str, None] = '0086043b2ab2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_users_username_trgm', 'users', ['username'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.create_index('ix_users_email_trgm', 'users', ['email'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    # Расширение pg_trgm не удаляется: им могут пользоваться другие объекты БД.
+    op.drop_index('ix_users_email_trgm', table_name='users', postgresql_using='gin')
+    op.drop_index('ix_users_username_trgm', table_name='users', postgresql_using='gin')
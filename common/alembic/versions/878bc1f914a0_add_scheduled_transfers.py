@@ -0,0 +1,66 @@
+"""Add scheduled transfers
+
+Revision ID: 878bc1f914a0
+Revises: 5b35dad89589
+Create Date: 2026-10-19 12:20:07.553918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '878bc1f914a0'
+down_revision: Union[str, None] = '5b35dad89589'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduled_transfers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('interval_seconds', sa.Integer(), nullable=True),
+    sa.Column('next_run_at', sa.DateTime(), nullable=False),
+    sa.Column('catch_up', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['receiver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scheduled_transfers_id'), 'scheduled_transfers', ['id'], unique=False)
+    op.create_index(op.f('ix_scheduled_transfers_sender_id'), 'scheduled_transfers', ['sender_id'], unique=False)
+    op.create_index('ix_scheduled_transfers_due', 'scheduled_transfers', ['next_run_at'], unique=False,
+                    postgresql_where=sa.text('is_active IS true'))
+    op.create_table('scheduled_transfer_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('schedule_id', sa.Integer(), nullable=False),
+    sa.Column('scheduled_for', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('executed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['schedule_id'], ['scheduled_transfers.id'], ),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scheduled_transfer_runs_schedule_id'), 'scheduled_transfer_runs', ['schedule_id'], unique=False)
+    op.create_index('ix_scheduled_transfer_runs_pending', 'scheduled_transfer_runs', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scheduled_transfer_runs_pending', table_name='scheduled_transfer_runs')
+    op.drop_index(op.f('ix_scheduled_transfer_runs_schedule_id'), table_name='scheduled_transfer_runs')
+    op.drop_table('scheduled_transfer_runs')
+    op.drop_index('ix_scheduled_transfers_due', table_name='scheduled_transfers')
+    op.drop_index(op.f('ix_scheduled_transfers_sender_id'), table_name='scheduled_transfers')
+    op.drop_index(op.f('ix_scheduled_transfers_id'), table_name='scheduled_transfers')
+    op.drop_table('scheduled_transfers')
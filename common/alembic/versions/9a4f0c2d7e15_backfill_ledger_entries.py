@@ -0,0 +1,59 @@
+"""Backfill ledger entries
+
+Revision ID: 9a4f0c2d7e15
+Revises: 5e1d7a3c9b42
+Create Date: 2026-10-19 22:03:41.270514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f0c2d7e15'
+down_revision: Union[str, None] = '5e1d7a3c9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Проводки для завершенных переводов, проведенных до появления журнала.
+    # Балансы восстанавливаются назад от входящего баланса первой проводки
+    # счета в журнале, а если проводок нет — от текущего баланса счета.
+    op.execute("""
+        WITH moves AS (
+            SELECT t.id AS transaction_id, m.account_id, t.currency, m.amount, t.created_at
+            FROM transactions t
+            CROSS JOIN LATERAL (VALUES (t.sender_id, -t.amount),
+                                       (t.receiver_id, t.amount)) AS m (account_id, amount)
+            WHERE t.status = 'completed'
+              AND NOT EXISTS (SELECT 1 FROM ledger_entries l WHERE l.transaction_id = t.id)
+        ),
+        anchors AS (
+            SELECT u.id AS account_id,
+                   COALESCE((SELECT l.balance_after - l.amount
+                             FROM ledger_entries l
+                             WHERE l.account_id = u.id
+                             ORDER BY l.created_at, l.id
+                             LIMIT 1), u.balance) AS balance
+            FROM users u
+        )
+        INSERT INTO ledger_entries (transaction_id, account_id, currency, amount,
+                                    balance_after, created_at)
+        SELECT m.transaction_id, m.account_id, m.currency, m.amount,
+               a.balance - COALESCE(SUM(m.amount) OVER (
+                   PARTITION BY m.account_id
+                   ORDER BY m.created_at DESC, m.transaction_id DESC
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0),
+               m.created_at
+        FROM moves m
+        JOIN anchors a ON a.account_id = m.account_id
+        ORDER BY m.created_at, m.transaction_id
+    """)
+
+
+def downgrade() -> None:
+    # Проводки неизменяемы (удаление запрещено триггером), а перенесенные
+    # проводки не отличаются от остальных, поэтому откат ничего не делает.
+    pass
@@ -0,0 +1,62 @@
+"""Add ledger entries
+
+Revision ID: c4bb4d21fe64
+Revises: 798e176c686d
+Create Date: 2026-10-19 17:31:55.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4bb4d21fe64'
+down_revision: Union[str, None] = '798e176c686d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ledger_entries',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('balance_after', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ledger_entries_transaction_id'), 'ledger_entries', ['transaction_id'], unique=False)
+    op.create_index('ix_ledger_entries_account_created', 'ledger_entries',
+                    ['account_id', 'created_at', 'id'], unique=False,
+                    postgresql_include=['transaction_id', 'currency', 'amount', 'balance_after'])
+    op.execute("""
+        CREATE FUNCTION ledger_entries_immutable() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'ledger_entries is append-only';
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER ledger_entries_no_update_delete
+        BEFORE UPDATE OR DELETE ON ledger_entries
+        FOR EACH ROW EXECUTE FUNCTION ledger_entries_immutable()
+    """)
+    op.execute("""
+        CREATE TRIGGER ledger_entries_no_truncate
+        BEFORE TRUNCATE ON ledger_entries
+        FOR EACH STATEMENT EXECUTE FUNCTION ledger_entries_immutable()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER ledger_entries_no_truncate ON ledger_entries")
+    op.execute("DROP TRIGGER ledger_entries_no_update_delete ON ledger_entries")
+    op.execute("DROP FUNCTION ledger_entries_immutable()")
+    op.drop_index('ix_ledger_entries_account_created', table_name='ledger_entries')
+    op.drop_index(op.f('ix_ledger_entries_transaction_id'), table_name='ledger_entries')
+    op.drop_table('ledger_entries')
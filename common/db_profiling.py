@@ -0,0 +1,114 @@
+"""
+Профилирование SQL-запросов: журнал медленных запросов и статистика по HTTP-запросам.
+
+Обработчики событий `before_cursor_execute`/`after_cursor_execute` движка
+измеряют длительность каждого SQL-запроса; время начала хранится в контексте
+выполнения запроса, поэтому запрос, завершившийся ошибкой, не сбивает замеры
+следующих запросов того же соединения. Запросы дольше порога пишутся в
+журнал с длительностью и адресом HTTP-запроса, в котором они выполнены.
+Количество SQL-запросов и их суммарная длительность накапливаются в
+контекстной переменной, которую устанавливает `QueryStatsMiddleware`.
+Асинхронный драйвер SQLAlchemy выполняет запросы в greenlet с тем же
+контекстом, поэтому статистика привязывается к запросу без явной передачи.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина текста SQL-запроса в журнале.
+MAX_STATEMENT_LENGTH = 1000
+
+
+class QueryStats:
+    """
+    Статистика SQL-запросов одного HTTP-запроса.
+    """
+    __slots__ = ("route", "statements", "duration")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.statements = 0
+        self.duration = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        """
+        Суммарная длительность SQL-запросов в миллисекундах.
+        """
+        return self.duration * 1000
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def install(engine: AsyncEngine, slow_query_ms: int) -> None:
+    """
+    Подключает профилирование к движку.
+
+    Параметры:
+    - engine (AsyncEngine): Асинхронный движок SQLAlchemy.
+    - slow_query_ms (int): Порог медленного запроса в миллисекундах (0 — не журналировать).
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_start_time = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context.query_start_time
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.duration += duration
+
+        duration_ms = duration * 1000
+        if slow_query_ms and duration_ms >= slow_query_ms:
+            route = stats.route if stats is not None else None
+            logger.warning("Медленный SQL-запрос: %.1f мс, маршрут: %s, запрос: %s",
+                           duration_ms, route, statement[:MAX_STATEMENT_LENGTH],
+                           extra={"duration_ms": round(duration_ms, 1), "route": route,
+                                  "statement": statement[:MAX_STATEMENT_LENGTH],
+                                  "executemany": executemany})
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware, собирающее статистику SQL-запросов каждого HTTP-запроса.
+
+    Статистика пишется в журнал на уровне DEBUG. При `headers=True` (режим
+    отладки) она также возвращается в заголовках `X-DB-Statements` и
+    `X-DB-Time-ms`. Для потоковых ответов заголовки отражают только запросы,
+    выполненные до начала ответа.
+    """
+
+    def __init__(self, app, headers: bool = False):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.headers:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-statements", str(stats.statements).encode()),
+                    (b"x-db-time-ms", f"{stats.duration_ms:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            logger.debug("%s: %d SQL-запросов, %.1f мс",
+                         stats.route, stats.statements, stats.duration_ms)
@@ -0,0 +1,49 @@
+"""
+Конфигурация gunicorn для запуска сервисов в несколько процессов.
+
+Запуск:
+    gunicorn -c common/gunicorn_conf.py app.main:app
+
+Параметры задаются переменными окружения:
+- `WEB_CONCURRENCY`: количество воркеров (по умолчанию число ядер CPU).
+- `GUNICORN_BIND`: адрес (по умолчанию `0.0.0.0:8000`).
+- `GUNICORN_WORKER_CLASS`: класс воркера (по умолчанию `uvicorn.workers.UvicornWorker`).
+- `GUNICORN_TIMEOUT`: перезапуск зависшего воркера, секунд (по умолчанию 30).
+- `GUNICORN_GRACEFUL_TIMEOUT`: ожидание завершения запросов при остановке, секунд (по умолчанию 30).
+- `GUNICORN_KEEPALIVE`: keep-alive соединений, секунд (по умолчанию 5).
+- `GUNICORN_MAX_REQUESTS`: перезапуск воркера после указанного числа запросов (по умолчанию 10000, 0 — отключено).
+- `GUNICORN_MAX_REQUESTS_JITTER`: случайная добавка к `GUNICORN_MAX_REQUESTS` (по умолчанию 1000).
+- `GUNICORN_PRELOAD`: загружать приложение до запуска воркеров (по умолчанию `false`).
+
+Воркеры ничего не разделяют: у каждого свой пул соединений с БД, кэши
+лимитов, JWKS и состояние ограничения частоты запросов.
+"""
+import multiprocessing
+import os
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+# Размер пулов соединений в app.database делится на количество воркеров.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+preload_app = _env_bool("GUNICORN_PRELOAD", False)
+accesslog = "-"
+
+def post_fork(server, worker):
+    """
+    Сбрасывает пул соединений, унаследованный от мастера при `preload_app`.
+
+    Соединения не закрываются, чтобы не разорвать их в мастере.
+    """
+    if preload_app:
+        from app.database import engine
+        engine.sync_engine.dispose(close=False)
@@ -0,0 +1,54 @@
+"""
+Маршруты для проверки состояния приложения.
+"""
+import os
+import time
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+@router.get("/live")
+async def live() -> dict:
+    """
+    Проверка, что процесс запущен.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready(request: Request) -> JSONResponse:
+    """
+    Проверка готовности к приему трафика.
+
+    - Ошибки:
+        - 503: Пока пул соединений не прогрет.
+    """
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse({"status": "warming up"},
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return JSONResponse({"status": "ok"})
+
+@router.get("/worker")
+async def worker(request: Request) -> dict:
+    """
+    Состояние обработавшего запрос воркера.
+
+    При запуске через gunicorn каждый воркер отвечает за себя, поэтому
+    повторные запросы показывают разные воркеры (поле `pid`).
+
+    - Ответ:
+        - `pid`, время работы воркера в секундах, готовность и состояние пула
+          соединений с БД.
+    """
+    pool = request.app.state.engine.pool
+    return {
+        "pid": os.getpid(),
+        "uptime": round(time.monotonic() - request.app.state.started_at, 1),
+        "ready": getattr(request.app.state, "ready", False),
+        "pool": {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        },
+    }
@@ -0,0 +1,35 @@
+"""
+Модуль для определения модели проводок двойной записи.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
+from .base import Base
+
+class LedgerEntry(Base):
+    """
+    Класс для представления проводки по счету.
+
+    Каждый перевод порождает две проводки: списание со счета отправителя
+    (отрицательная сумма) и зачисление на счет получателя (положительная),
+    поэтому сумма проводок одной транзакции равна нулю. `balance_after` —
+    баланс счета после проводки, поэтому баланс на любой момент читается
+    одной строкой индекса. Индекс `(account_id, created_at, id)` включает
+    все остальные столбцы, поэтому история счета читается index-only scan.
+    Проводки неизменяемы: изменение и удаление запрещены триггером в БД.
+    Внешнего ключа на `transactions` нет, так как транзакции переносятся в
+    архив, а журнал проводок остается полным.
+    """
+    __tablename__ = "ledger_entries"
+
+    id = Column(BigInteger, primary_key=True)
+    transaction_id = Column(Integer, nullable=False, index=True)
+    account_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    currency = Column(String(3), nullable=False)
+    amount = Column(BigInteger, nullable=False)
+    balance_after = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_ledger_entries_account_created", "account_id", "created_at", "id",
+              postgresql_include=["transaction_id", "currency", "amount", "balance_after"]),
+    )
@@ -0,0 +1,27 @@
+"""
+Модуль для определения модели лимитов исходящих переводов.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, UniqueConstraint
+from .base import Base
+
+class TransferLimit(Base):
+    """
+    Класс для представления лимита исходящих переводов за скользящее окно.
+
+    Лимит без `user_id` действует для всех счетов в валюте `currency`; лимит
+    конкретного пользователя заменяет его для того же окна. `max_amount`
+    задается в минимальных единицах валюты.
+    """
+    __tablename__ = "transfer_limits"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    currency = Column(String(3), nullable=False)
+    window_seconds = Column(Integer, nullable=False)
+    max_amount = Column(BigInteger, nullable=True)
+    max_count = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "currency", "window_seconds",
+                         name="uq_transfer_limits_user_currency_window"),
+    )
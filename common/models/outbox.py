@@ -0,0 +1,33 @@
+"""
+Модуль для определения моделей транзакционного outbox.
+"""
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, DateTime, JSON
+from .base import Base
+
+class OutboxEvent(Base):
+    """
+    Класс для представления события, ожидающего доставки внешним потребителям.
+
+    Записывается в той же транзакции, что и изменение данных, поэтому событие
+    появляется тогда и только тогда, когда транзакция зафиксирована.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    topic = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class OutboxOffset(Base):
+    """
+    Класс для хранения максимального доставленного ID события для каждого ретранслятора.
+
+    Используется только для мониторинга: события фиксируются не в порядке ID,
+    поэтому это значение нельзя использовать как границу для отбрасывания дублей.
+    """
+    __tablename__ = "outbox_offsets"
+
+    consumer = Column(String, primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
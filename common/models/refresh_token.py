@@ -0,0 +1,26 @@
+"""
+Модуль для определения модели refresh-токенов.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from .base import Base
+
+class RefreshToken(Base):
+    """
+    Класс для представления выданного refresh-токена.
+
+    Хранится только SHA-256 хеш токена. Все токены, полученные ротацией от
+    одного входа, имеют общий `family_id`: при повторном использовании уже
+    замененного токена отзывается вся цепочка. Отозванные токены с
+    `revoked_at` образуют список отзыва.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    family_id = Column(String(36), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by_id = Column(Integer, ForeignKey("refresh_tokens.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
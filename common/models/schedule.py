@@ -0,0 +1,56 @@
+"""
+Модуль для определения моделей запланированных переводов.
+"""
+from datetime import datetime
+from sqlalchemy import (Column, Integer, BigInteger, String, Boolean, ForeignKey,
+                        DateTime, Index)
+from .base import Base
+
+class ScheduledTransfer(Base):
+    """
+    Класс для представления разового или периодического перевода по расписанию.
+
+    Сумма хранится в минимальных единицах валюты. Если `interval_seconds` не
+    задан, перевод выполняется один раз.
+    """
+    __tablename__ = "scheduled_transfers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sender_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=False)
+    interval_seconds = Column(Integer, nullable=True)
+    next_run_at = Column(DateTime, nullable=False)
+    catch_up = Column(String, nullable=False, default="once")
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_scheduled_transfers_due", "next_run_at",
+              postgresql_where=is_active.is_(True)),
+    )
+
+class ScheduledTransferRun(Base):
+    """
+    Класс для представления одного запуска запланированного перевода.
+
+    Запуск создается со статусом `pending` при выборке расписания и
+    переходит в `completed`, `failed` или `cancelled` после выполнения.
+    """
+    __tablename__ = "scheduled_transfer_runs"
+
+    id = Column(Integer, primary_key=True)
+    schedule_id = Column(Integer, ForeignKey("scheduled_transfers.id"), nullable=False, index=True)
+    scheduled_for = Column(DateTime, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"),
+                            nullable=True)
+    error = Column(String, nullable=True)
+    executed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_scheduled_transfer_runs_pending", "id",
+              postgresql_where=status == "pending"),
+    )
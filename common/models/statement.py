@@ -0,0 +1,25 @@
+"""
+Модуль для определения модели итогов выписки за период.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Date, DateTime
+from .base import Base
+
+class StatementSummary(Base):
+    """
+    Класс для представления итогов счета за календарный месяц.
+
+    Рассчитывается по журналу проводок после окончания периода. Суммы хранятся
+    в минимальных единицах валюты.
+    """
+    __tablename__ = "statement_summaries"
+
+    account_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    currency = Column(String(3), nullable=False)
+    opening_balance = Column(BigInteger, nullable=False)
+    closing_balance = Column(BigInteger, nullable=False)
+    total_debit = Column(BigInteger, nullable=False)
+    total_credit = Column(BigInteger, nullable=False)
+    entry_count = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
@@ -2,22 +2,33 @@
 Модуль для определения модели транзакций.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, DECIMAL, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Transaction(Base):
     """
     Класс для представления транзакции между пользователями.
+
+    Сумма хранится в минимальных единицах валюты (см. `common.money`).
+    У компенсирующей транзакции (возврата) `parent_id` указывает на исходную.
     """
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(DECIMAL, nullable=False)
+    amount = Column(BigInteger, nullable=False)
+    currency = Column(String(3), nullable=False, default="RUB")
     status = Column(String, default="pending")
     created_at = Column(DateTime, default=datetime.utcnow)
+    parent_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"),
+                       nullable=True, index=True)
 
     sender = relationship("User", foreign_keys=[sender_id])
     receiver = relationship("User", foreign_keys=[receiver_id])
+
+    __table_args__ = (
+        Index("ix_transactions_sender_id_created_at", "sender_id", "created_at"),
+        Index("ix_transactions_created_at", "created_at"),
+    )
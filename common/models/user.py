@@ -1,12 +1,16 @@
 """
 Модуль для определения модели пользователя.
 """
-from sqlalchemy import Column, Integer, String, DECIMAL
+from sqlalchemy import Column, Integer, String, BigInteger, Index
 from .base import Base
 
 class User(Base):
     """
     Класс для представления пользователя системы.
+
+    Баланс хранится в минимальных единицах валюты счета (см. `common.money`).
+    Триграммные GIN-индексы по имени и email используются для поиска по
+    подстроке и нечеткого поиска (расширение `pg_trgm`).
     """
     __tablename__ = "users"
 
@@ -14,4 +18,12 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     email = Column(String, unique=True, index=True)
-    balance = Column(DECIMAL, default=1000.0)
+    balance = Column(BigInteger, nullable=False, default=100000)
+    currency = Column(String(3), nullable=False, default="RUB")
+
+    __table_args__ = (
+        Index("ix_users_username_trgm", "username", postgresql_using="gin",
+              postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+    )
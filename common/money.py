@@ -0,0 +1,66 @@
+"""
+Денежные суммы в минимальных единицах валюты.
+
+В базе данных суммы и балансы хранятся целым числом минимальных единиц
+(копеек, центов) в колонке BIGINT рядом с кодом валюты. Перевод в `Decimal`
+выполняется только на границе API.
+"""
+from decimal import Decimal
+
+# Количество знаков после запятой по ISO 4217.
+CURRENCIES = {
+    "RUB": 2,
+    "USD": 2,
+    "EUR": 2,
+    "JPY": 0,
+}
+
+DEFAULT_CURRENCY = "RUB"
+
+_SCALES = {code: Decimal(10) ** exponent for code, exponent in CURRENCIES.items()}
+
+def validate_currency(currency: str) -> str:
+    """
+    Проверяет, что валюта поддерживается.
+
+    Исключения:
+    - ValueError: Если валюта неизвестна.
+    """
+    if currency not in CURRENCIES:
+        raise ValueError(f"Неподдерживаемая валюта: {currency}")
+    return currency
+
+def to_minor(amount: Decimal, currency: str) -> int:
+    """
+    Переводит сумму в минимальные единицы валюты.
+
+    Параметры:
+    - amount (Decimal): Сумма в основных единицах.
+    - currency (str): Код валюты.
+
+    Возвращает:
+    - int: Сумма в минимальных единицах.
+
+    Исключения:
+    - ValueError: Если валюта неизвестна или у суммы больше знаков после запятой,
+      чем допускает валюта.
+    """
+    minor = Decimal(amount) * _SCALES[validate_currency(currency)]
+    if minor != minor.to_integral_value():
+        raise ValueError(
+            f"Сумма в {currency} допускает не более {CURRENCIES[currency]} знаков после запятой"
+        )
+    return int(minor)
+
+def from_minor(amount: int, currency: str) -> Decimal:
+    """
+    Переводит сумму из минимальных единиц валюты в основные.
+
+    Параметры:
+    - amount (int): Сумма в минимальных единицах.
+    - currency (str): Код валюты.
+
+    Возвращает:
+    - Decimal: Сумма в основных единицах.
+    """
+    return Decimal(amount).scaleb(-CURRENCIES[currency])
@@ -0,0 +1,35 @@
+"""
+Распределение соединений с БД между воркерами.
+
+Каждый воркер gunicorn держит собственный пул соединений, поэтому общий
+бюджет сервиса `DB_MAX_CONNECTIONS` делится на число воркеров
+`WEB_CONCURRENCY`. Сумма бюджетов всех сервисов должна оставаться меньше
+`max_connections` Postgres.
+"""
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+def pool_limits(max_connections: int, workers: int) -> Tuple[int, int]:
+    """
+    Рассчитывает размер пула одного воркера.
+
+    Половина доли воркера держится открытой постоянно (`pool_size`), остальные
+    соединения открываются при пиковой нагрузке (`max_overflow`).
+
+    Параметры:
+    - max_connections (int): Бюджет соединений сервиса на все воркеры.
+    - workers (int): Количество воркеров.
+
+    Возвращает:
+    - Tuple[int, int]: `pool_size` и `max_overflow` для `create_async_engine`.
+    """
+    workers = max(workers, 1)
+    per_worker = max_connections // workers
+    if per_worker < 1:
+        logger.warning("Бюджет соединений %d меньше числа воркеров %d, "
+                       "каждому воркеру выделено одно соединение", max_connections, workers)
+        per_worker = 1
+    pool_size = max(per_worker // 2, 1)
+    return pool_size, per_worker - pool_size
@@ -0,0 +1,191 @@
+"""
+Ограничение частоты запросов и числа одновременных запросов клиента.
+
+Частота ограничивается алгоритмом token bucket отдельно для каждого маршрута
+и клиента. Клиент определяется по `sub` из JWT (заголовок `Authorization`
+или параметр `token`), а без токена — по IP-адресу.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import jwt
+from starlette.responses import JSONResponse
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+def parse_rate(value: str) -> Tuple[float, int]:
+    """
+    Разбирает лимит вида `10/minute`.
+
+    Параметры:
+    - value (str): Количество запросов и период (`second`, `minute`, `hour`).
+
+    Возвращает:
+    - Tuple[float, int]: Скорость пополнения (токенов в секунду) и емкость корзины.
+
+    Исключения:
+    - ValueError: Если строка лимита некорректна.
+    """
+    count, _, period = value.partition("/")
+    if period not in _PERIODS or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f"Некорректный лимит запросов: {value}")
+    return int(count) / _PERIODS[period], int(count)
+
+class RateLimitBackend:
+    """
+    Интерфейс хранилища состояния лимитов.
+    """
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        """
+        Забирает токен из корзины.
+
+        Возвращает:
+        - float: 0, если запрос разрешен, иначе время в секундах до появления токена.
+        """
+        raise NotImplementedError
+
+    async def enter(self, key: str, limit: int) -> bool:
+        """
+        Учитывает начало запроса. Возвращает False, если достигнут лимит одновременных запросов.
+        """
+        raise NotImplementedError
+
+    async def leave(self, key: str) -> None:
+        """
+        Учитывает завершение запроса.
+        """
+        raise NotImplementedError
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Хранилище лимитов в памяти процесса.
+
+    Корзины хранятся в порядке последнего обращения (LRU). При превышении
+    `max_keys` удаляется корзина, к которой дольше всего не обращались, за
+    O(1); удаленная корзина при следующем обращении считается полной.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._active: Dict[str, int] = {}
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def enter(self, key: str, limit: int) -> bool:
+        active = self._active.get(key, 0)
+        if active >= limit:
+            return False
+        self._active[key] = active + 1
+        return True
+
+    async def leave(self, key: str) -> None:
+        active = self._active.get(key, 0) - 1
+        if active > 0:
+            self._active[key] = active
+        else:
+            self._active.pop(key, None)
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware, ограничивающее частоту и параллельность запросов.
+
+    Параметры:
+    - limits (Dict[str, str]): Лимиты по маршрутам, например
+      `{"POST /auth/login": "10/minute"}`. Остальные маршруты не ограничиваются.
+    - decode_token (Callable): Корутина проверки JWT, возвращающая его содержимое
+      или выбрасывающая `jwt.PyJWTError`.
+    - concurrency (int): Максимум одновременных запросов клиента к ограниченным
+      маршрутам (0 — без ограничения).
+    - backend (RateLimitBackend): Хранилище состояния, по умолчанию в памяти процесса.
+    """
+
+    def __init__(self, app, limits: Dict[str, str],
+                 decode_token: Callable[[str], Awaitable[dict]],
+                 concurrency: int = 0, backend: Optional[RateLimitBackend] = None):
+        self.app = app
+        self.limits = {route: parse_rate(value) for route, value in limits.items()}
+        self.decode_token = decode_token
+        self.concurrency = concurrency
+        self.backend = backend or InMemoryBackend()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        limit = self.limits.get(route)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = await self._client_key(scope)
+        wait = await self.backend.acquire(f"{route}|{client}", *limit)
+        if wait:
+            await self._reject(wait)(scope, receive, send)
+            return
+
+        if not self.concurrency:
+            await self.app(scope, receive, send)
+            return
+
+        concurrency_key = f"concurrency|{client}"
+        if not await self.backend.enter(concurrency_key, self.concurrency):
+            await self._reject(1)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await self.backend.leave(concurrency_key)
+
+    async def _client_key(self, scope) -> str:
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    token = credentials
+                break
+        if token is None:
+            for part in scope.get("query_string", b"").decode("latin-1").split("&"):
+                if part.startswith("token="):
+                    token = part[len("token="):]
+                    break
+
+        if token:
+            try:
+                payload = await self.decode_token(token)
+            except jwt.PyJWTError:
+                payload = {}
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    @staticmethod
+    def _reject(wait: float) -> JSONResponse:
+        return JSONResponse({"detail": "Слишком много запросов"},
+                            status_code=429,
+                            headers={"Retry-After": str(math.ceil(wait))})
@@ -0,0 +1,75 @@
+"""
+Подготовка приложения к приему трафика: проверка миграций и прогрев пула.
+"""
+import asyncio
+import logging
+import os
+from typing import Sequence
+from alembic.script import ScriptDirectory
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Executable
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic")
+
+async def check_alembic_head(engine: AsyncEngine) -> None:
+    """
+    Проверяет, что база данных обновлена до последней миграции Alembic.
+
+    Исключения:
+    - RuntimeError: Если версия схемы в базе не совпадает с head миграций.
+    """
+    heads = set(ScriptDirectory(ALEMBIC_DIR).get_heads())
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        current = set(result.scalars().all())
+    if current != heads:
+        raise RuntimeError(
+            f"Схема БД не обновлена: текущая версия {sorted(current)}, "
+            f"ожидается {sorted(heads)}. Выполните `alembic upgrade head`"
+        )
+    logger.info("Схема БД соответствует миграциям: %s", ", ".join(sorted(heads)))
+
+async def warm_up(engine: AsyncEngine, connections: int,
+                  statements: Sequence[Executable]) -> None:
+    """
+    Открывает соединения пула и подготавливает на них горячие запросы.
+
+    asyncpg кэширует подготовленные запросы отдельно в каждом соединении,
+    поэтому запросы выполняются на каждом из открытых соединений. Запросы
+    должны совпадать с используемыми в маршрутах, параметры могут быть любыми.
+
+    Параметры:
+    - engine (AsyncEngine): Движок базы данных.
+    - connections (int): Сколько соединений открыть (не больше размера пула).
+    - statements (Sequence[Executable]): Горячие запросы.
+    """
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(await engine.connect())
+        for conn in opened:
+            for statement in statements:
+                await conn.execute(statement)
+            await conn.rollback()
+    finally:
+        for conn in opened:
+            await conn.close()
+    logger.info("Пул прогрет: соединений %d, запросов %d", len(opened), len(statements))
+
+async def warm_up_until_ready(app: FastAPI, engine: AsyncEngine, connections: int,
+                              statements: Sequence[Executable]) -> None:
+    """
+    Прогревает пул, повторяя попытки при ошибках, и помечает приложение готовым.
+    """
+    while True:
+        try:
+            await warm_up(engine, connections, statements)
+            break
+        except Exception:
+            logger.exception("Ошибка прогрева пула, повтор через 1 секунду")
+            await asyncio.sleep(1)
+    app.state.ready = True
@@ -0,0 +1,277 @@
+"""
+Архивация старых транзакций в холодное хранилище.
+
+Запуск:
+    python -m app.archive [--retention-days 365] [--batch-size 10000] [--dir archive]
+
+Транзакции старше срока хранения выгружаются пачками в файлы
+`ARCHIVE_DIR/transactions-<первый id>-<последний id>.ndjson.gz` (одна транзакция
+на строку) и удаляются из `transactions`. Каждая пачка обрабатывается в
+отдельной транзакции БД: строки блокируются, файл записывается на диск и
+регистрируется в `manifest.json` с признаком `pending`, строки удаляются,
+после чего транзакция фиксируется и признак снимается. Если фиксация не
+удалась или ее результат неизвестен (обрыв соединения во время COMMIT),
+запись остается в манифесте с признаком `pending`: следующий запуск
+архивации сверяет такие пачки с `transactions` и удаляет только те, строки
+которых остались в таблице. Пока пачка не сверена, ее транзакции могут
+читаться и из архива, и из таблицы; чтение архива отбрасывает дубли по ID.
+
+Журнал проводок `ledger_entries` не архивируется, поэтому балансы и выписки
+за любой период не зависят от архивации.
+
+Возвраты архивируются вместе с исходной транзакцией, а транзакции, у которых
+есть возвраты моложе срока хранения, остаются в таблице, чтобы не потерять
+связь `parent_id`.
+
+Одновременно должен работать только один процесс архивации: манифест
+изменяется без межпроцессных блокировок.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import delete, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import AsyncSessionLocal
+from common.logging_config import setup_logging
+from common.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+def serialize(transaction: Transaction) -> dict:
+    """
+    Представляет транзакцию в виде строки архива.
+    """
+    return {
+        "id": transaction.id,
+        "sender_id": transaction.sender_id,
+        "receiver_id": transaction.receiver_id,
+        "amount": transaction.amount,
+        "currency": transaction.currency,
+        "status": transaction.status,
+        "created_at": transaction.created_at.isoformat(),
+        "parent_id": transaction.parent_id,
+    }
+
+
+def load_manifest(directory: str) -> dict:
+    """
+    Читает манифест архива. Если архива еще нет, возвращает пустой манифест.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"chunks": []}
+
+
+def _replace(path: str, data: bytes) -> None:
+    """
+    Атомарно записывает файл: во временный файл с fsync и переименованием.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def save_manifest(directory: str, manifest: dict) -> None:
+    """
+    Атомарно сохраняет манифест архива.
+    """
+    _replace(os.path.join(directory, MANIFEST),
+             json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def write_chunk(directory: str, rows: List[dict]) -> dict:
+    """
+    Записывает пачку транзакций в сжатый NDJSON-файл.
+
+    Возвращает:
+    - dict: Запись манифеста о файле.
+    """
+    name = f"transactions-{rows[0]['id']}-{rows[-1]['id']}.ndjson.gz"
+    lines = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    _replace(os.path.join(directory, name), gzip.compress(lines.encode("utf-8")))
+    created = [row["created_at"] for row in rows]
+    return {
+        "file": name,
+        "first_id": rows[0]["id"],
+        "last_id": rows[-1]["id"],
+        "min_created_at": min(created),
+        "max_created_at": max(created),
+        "rows": len(rows),
+    }
+
+
+def chunk_ids(directory: str, chunk: dict) -> List[int]:
+    """
+    Читает ID транзакций пачки из ее файла.
+    """
+    with gzip.open(os.path.join(directory, chunk["file"]), "rt", encoding="utf-8") as file:
+        return [json.loads(line)["id"] for line in file]
+
+
+async def archive_batch(directory: str, cutoff: datetime, batch_size: int) -> int:
+    """
+    Архивирует одну пачку транзакций старше `cutoff`.
+
+    Возвращает:
+    - int: Количество архивированных транзакций (0, если архивировать нечего).
+    """
+    child = aliased(Transaction)
+    async with AsyncSessionLocal() as db:
+        parents = (
+            select(Transaction.id)
+            .where(Transaction.created_at < cutoff,
+                   Transaction.parent_id.is_(None),
+                   ~exists().where(child.parent_id == Transaction.id,
+                                   child.created_at >= cutoff))
+            .order_by(Transaction.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        parent_ids = list((await db.execute(parents)).scalars())
+        if not parent_ids:
+            return 0
+
+        result = await db.execute(
+            select(Transaction)
+            .where(or_(Transaction.id.in_(parent_ids),
+                       Transaction.parent_id.in_(parent_ids)))
+            .order_by(Transaction.id)
+            .with_for_update()
+        )
+        rows = [serialize(transaction) for transaction in result.scalars()]
+
+        manifest = await run_in_threadpool(load_manifest, directory)
+        chunk = await run_in_threadpool(write_chunk, directory, rows)
+        chunk["pending"] = True
+        manifest["chunks"].append(chunk)
+        await run_in_threadpool(save_manifest, directory, manifest)
+        await db.execute(
+            delete(Transaction)
+            .where(Transaction.id.in_([row["id"] for row in rows]))
+        )
+        await db.commit()
+
+    del chunk["pending"]
+    await run_in_threadpool(save_manifest, directory, manifest)
+
+    logger.info("Архивировано транзакций: %d (%s)", len(rows), chunk["file"])
+    return len(rows)
+
+
+async def reconcile_pending(directory: str) -> None:
+    """
+    Сверяет с `transactions` пачки, фиксация которых не была подтверждена.
+
+    Строки пачки удаляются одной транзакцией БД, поэтому если хотя бы одна из
+    них осталась в таблице, фиксация не состоялась: файл пачки удаляется, и
+    строки будут архивированы заново. Иначе с пачки снимается признак `pending`.
+    """
+    manifest = await run_in_threadpool(load_manifest, directory)
+    pending = [chunk for chunk in manifest["chunks"] if chunk.get("pending")]
+    if not pending:
+        return
+    async with AsyncSessionLocal() as db:
+        for chunk in pending:
+            ids = await run_in_threadpool(chunk_ids, directory, chunk)
+            remaining = await db.scalar(select(exists().where(Transaction.id.in_(ids))))
+            if remaining:
+                manifest["chunks"].remove(chunk)
+                await run_in_threadpool(save_manifest, directory, manifest)
+                await run_in_threadpool(os.remove, os.path.join(directory, chunk["file"]))
+                logger.warning("Пачка %s не была зафиксирована и удалена из архива",
+                               chunk["file"])
+            else:
+                del chunk["pending"]
+                await run_in_threadpool(save_manifest, directory, manifest)
+                logger.info("Пачка %s сверена с транзакциями", chunk["file"])
+
+
+async def run_archive(directory: str, retention_days: int, batch_size: int) -> int:
+    """
+    Архивирует все транзакции старше срока хранения.
+
+    Возвращает:
+    - int: Общее количество архивированных транзакций.
+    """
+    os.makedirs(directory, exist_ok=True)
+    await reconcile_pending(directory)
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+    while True:
+        archived = await archive_batch(directory, cutoff, batch_size)
+        if not archived:
+            break
+        total += archived
+    logger.info("Архивация завершена: %d транзакций старше %s", total, cutoff)
+    return total
+
+
+def read_archived(user_id: int, start: Optional[datetime], end: Optional[datetime],
+                  limit: int, directory: Optional[str] = None) -> List[dict]:
+    """
+    Читает из архива транзакции пользователя за период.
+
+    Границы периода включаются, время сравнивается в UTC без часового пояса.
+    Открываются только файлы, диапазон дат которых по манифесту пересекается
+    с периодом. Функция блокирующая, из асинхронного кода ее нужно вызывать
+    через `run_in_threadpool`.
+
+    Возвращает:
+    - List[dict]: Не больше `limit` транзакций в порядке возрастания ID.
+    """
+    directory = directory or settings.ARCHIVE_DIR
+    found: Dict[int, dict] = {}
+    for chunk in sorted(load_manifest(directory)["chunks"], key=lambda item: item["first_id"]):
+        if start and datetime.fromisoformat(chunk["max_created_at"]) < start:
+            continue
+        if end and datetime.fromisoformat(chunk["min_created_at"]) > end:
+            continue
+        if len(found) >= limit and chunk["first_id"] > max(found):
+            break
+        with gzip.open(os.path.join(directory, chunk["file"]), "rt", encoding="utf-8") as file:
+            for line in file:
+                row = json.loads(line)
+                if user_id not in (row["sender_id"], row["receiver_id"]):
+                    continue
+                created_at = datetime.fromisoformat(row["created_at"])
+                if start and created_at < start:
+                    continue
+                if end and created_at > end:
+                    continue
+                found[row["id"]] = row
+    return [found[key] for key in sorted(found)[:limit]]
+
+
+def main() -> None:
+    """
+    Точка входа архивации.
+    """
+    parser = argparse.ArgumentParser(description="Архивация старых транзакций")
+    parser.add_argument("--retention-days", type=int, default=settings.ARCHIVE_RETENTION_DAYS,
+                        help="архивировать транзакции старше указанного числа дней")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--dir", default=settings.ARCHIVE_DIR, help="каталог архива")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(run_archive(args.dir, args.retention_days, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 """
 Модуль конфигурации для приложения аутентификации.
 """
+from typing import Dict, Optional
+from jwt.algorithms import get_default_algorithms
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,9 +11,58 @@ class Settings(BaseSettings):
     Класс для хранения настроек приложения аутентификации.
     """
     DATABASE_URL: str
-    JWT_SECRET: str
+    JWT_SECRET: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION: int = 3600
+    JWKS_URL: Optional[str] = None
+    JWKS_CACHE_TTL: int = 300
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /transactions/transfer": "10/second",
+    }
+    RATE_LIMIT_CONCURRENCY: int = 4
+    CHECK_MIGRATIONS: bool = True
+    DB_WARMUP_CONNECTIONS: int = 5
+    DB_MAX_CONNECTIONS: int = 20
+    WEB_CONCURRENCY: int = 1
+    DEBUG: bool = False
+    SLOW_QUERY_MS: int = 200
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL: float = 5.0
+    SCHEDULER_BATCH_SIZE: int = 100
+    SCHEDULER_CONCURRENCY: int = 4
+    SCHEDULER_MAX_CATCH_UP: int = 100
+    SCHEDULER_MISFIRE_GRACE: int = 300
+    LIMITS_CACHE_TTL: int = 60
+    LIMITS_MAX_ACCOUNTS: int = 100_000
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_CHANNEL: str = "transfer_events"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT: int = 15
+    OUTBOX_SINK: str = "stdout"
+    OUTBOX_CONSUMER: str = "relay"
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_RETENTION_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 10_000
+
+    @model_validator(mode="after")
+    def check_jwt_key(self):
+        """
+        Проверяет, что алгоритм подписи JWT поддерживается и для него задан ключ:
+        `JWT_SECRET` для HS-алгоритмов, `JWKS_URL` для асимметричных.
+
+        Исключения:
+            ValueError: Если алгоритм не поддерживается или ключ не задан.
+        """
+        if self.JWT_ALGORITHM not in get_default_algorithms():
+            raise ValueError(f"Неподдерживаемый алгоритм JWT: {self.JWT_ALGORITHM}")
+        if self.JWT_ALGORITHM.startswith("HS"):
+            if not self.JWT_SECRET:
+                raise ValueError(f"Для алгоритма {self.JWT_ALGORITHM} нужен JWT_SECRET")
+        elif not self.JWKS_URL:
+            raise ValueError(f"Для алгоритма {self.JWT_ALGORITHM} нужен JWKS_URL")
+        return self
 
     class Config:
         """
@@ -0,0 +1,236 @@
+"""
+Модуль для рассылки событий о переводах подписчикам в реальном времени.
+
+События публикуются из `create_transaction` и раздаются подписчикам текущего
+процесса. При `EVENTS_BACKEND=postgres` событие отправляется через
+Postgres NOTIFY внутри транзакции перевода, а каждый воркер получает его
+через LISTEN, поэтому подписчики видят переводы, созданные любым воркером.
+Если соединение LISTEN потеряно (например, при перезапуске Postgres), воркер
+переподключается с нарастающей паузой; уведомления, отправленные за время
+переподключения, теряются.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, Optional, Set
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import engine
+from common.models.transaction import Transaction
+from common.models.user import User
+from common.money import from_minor
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед переподключением LISTEN в секундах: начальная и максимальная.
+LISTEN_RETRY_MIN = 1.0
+LISTEN_RETRY_MAX = 30.0
+
+
+class Subscriber:
+    """
+    Подписчик на события одного пользователя.
+
+    Буфер событий ограничен `EVENTS_QUEUE_SIZE`: если клиент не успевает
+    читать поток, самые старые события вытесняются новыми.
+    """
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, event: dict) -> None:
+        """
+        Кладет событие в буфер, вытесняя самое старое при переполнении.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning("Подписчик пользователя %d не успевает читать события",
+                               self.user_id)
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """
+    Внутрипроцессный брокер событий о переводах.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Запускает прослушивание канала Postgres, если включен бэкенд `postgres`.
+        """
+        if settings.EVENTS_BACKEND != "postgres" or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        Останавливает прослушивание канала и возвращает соединение в пул.
+        """
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        """
+        Держит LISTEN на канале и переподключается при потере соединения.
+
+        Для LISTEN из пула забирается одно соединение на все время работы.
+        """
+        delay = LISTEN_RETRY_MIN
+        while True:
+            closed = asyncio.Event()
+            try:
+                async with engine.connect() as connection:
+                    raw = (await connection.get_raw_connection()).driver_connection
+                    raw.add_termination_listener(lambda _: closed.set())
+                    await raw.add_listener(settings.EVENTS_CHANNEL, self._on_notify)
+                    logger.info("Подписка на канал событий %s", settings.EVENTS_CHANNEL)
+                    delay = LISTEN_RETRY_MIN
+                    try:
+                        await closed.wait()
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(settings.EVENTS_CHANNEL, self._on_notify)
+                    await connection.invalidate()
+                logger.warning("Соединение с каналом событий %s потеряно",
+                               settings.EVENTS_CHANNEL)
+            except Exception:
+                logger.exception("Не удалось подписаться на канал событий %s",
+                                 settings.EVENTS_CHANNEL)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTEN_RETRY_MAX)
+
+    async def subscribe(self, user_id: int) -> Subscriber:
+        """
+        Регистрирует нового подписчика на события пользователя.
+        """
+        await self.start()
+        subscriber = Subscriber(user_id, settings.EVENTS_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """
+        Удаляет подписчика.
+        """
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.user_id]
+
+    async def notify(self, db: AsyncSession, event: dict) -> None:
+        """
+        Ставит событие в очередь NOTIFY текущей транзакции.
+
+        Postgres доставляет уведомление только после фиксации транзакции,
+        поэтому вызывать метод нужно до `commit`.
+        """
+        if settings.EVENTS_BACKEND != "postgres":
+            return
+        await db.execute(select(func.pg_notify(settings.EVENTS_CHANNEL,
+                                               json.dumps(event))))
+
+    def publish(self, event: dict) -> None:
+        """
+        Раздает событие подписчикам текущего процесса после фиксации транзакции.
+
+        При бэкенде `postgres` событие придет через LISTEN, поэтому здесь
+        ничего не делается.
+        """
+        if settings.EVENTS_BACKEND == "postgres":
+            return
+        self.dispatch(event)
+
+    def dispatch(self, event: dict) -> None:
+        """
+        Раздает событие подписчикам отправителя и получателя.
+
+        Каждый подписчик получает только свой баланс.
+        """
+        balances = event.get("balances", {})
+        for user_id in {event["sender_id"], event["receiver_id"]}:
+            subscribers = self._subscribers.get(user_id)
+            if not subscribers:
+                continue
+            user_event = {key: value for key, value in event.items() if key != "balances"}
+            user_event["balance"] = balances.get(str(user_id))
+            for subscriber in subscribers:
+                subscriber.push(user_event)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except (ValueError, KeyError):
+            logger.exception("Некорректное событие в канале %s", channel)
+
+
+broker = EventBroker()
+
+
+def transfer_event(transaction: Transaction, sender: User, receiver: User) -> dict:
+    """
+    Формирует событие о переводе.
+
+    Параметры:
+    - transaction (Transaction): Созданная транзакция (после flush).
+    - sender (User): Отправитель с обновленным балансом.
+    - receiver (User): Получатель с обновленным балансом.
+
+    Возвращает:
+    - dict: Событие, пригодное для сериализации в JSON.
+    """
+    return {
+        "type": "reversal" if transaction.parent_id else "transfer",
+        "id": transaction.id,
+        "parent_id": transaction.parent_id,
+        "sender_id": transaction.sender_id,
+        "receiver_id": transaction.receiver_id,
+        "amount": str(from_minor(transaction.amount, transaction.currency)),
+        "currency": transaction.currency,
+        "status": transaction.status,
+        "created_at": transaction.created_at.isoformat(),
+        "balances": {
+            str(sender.id): str(from_minor(sender.balance, sender.currency)),
+            str(receiver.id): str(from_minor(receiver.balance, receiver.currency)),
+        },
+    }
+
+
+async def stream(user_id: int) -> AsyncIterator[str]:
+    """
+    Асинхронный генератор событий пользователя в формате Server-Sent Events.
+
+    Подписка создается при первой итерации, а не в обработчике запроса:
+    если клиент отключится до начала ответа, генератор не запустится и
+    подписчик не останется в брокере. Если событий нет дольше
+    `EVENTS_HEARTBEAT` секунд, отправляет комментарий, чтобы прокси не
+    закрывали соединение.
+    """
+    subscriber = await broker.subscribe(user_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(),
+                                               timeout=settings.EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
@@ -0,0 +1,72 @@
+"""
+Кэш открытых ключей сервиса аутентификации (JWKS).
+
+Позволяет проверять асимметрично подписанные токены локально, без общего
+секрета и без запроса к сервису аутентификации на каждый токен.
+"""
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+from typing import Dict, Optional
+import jwt
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Минимальная пауза между обновлениями при неизвестном `kid`.
+MIN_REFRESH_INTERVAL = 10
+
+
+class JWKSCache:
+    """
+    Кэш ключей из JWKS с обновлением по TTL и при появлении нового `kid`.
+
+    Если сервис аутентификации недоступен, продолжают использоваться
+    ранее загруженные ключи.
+    """
+
+    def __init__(self, url: str, ttl: int):
+        self.url = url
+        self.ttl = ttl
+        self._keys: Dict[Optional[str], object] = {}
+        self._fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: Optional[str]):
+        """
+        Возвращает открытый ключ по `kid` из заголовка токена.
+
+        Исключения:
+        - jwt.InvalidTokenError: Если ключ с таким `kid` не найден.
+        """
+        if kid not in self._keys or self._expired():
+            async with self._lock:
+                age = time.monotonic() - self._fetched_at
+                if self._expired() or (kid not in self._keys and age >= MIN_REFRESH_INTERVAL):
+                    await self._refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Неизвестный ключ подписи: {kid}")
+        return key
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._fetched_at >= self.ttl
+
+    async def _refresh(self) -> None:
+        try:
+            data = await run_in_threadpool(self._fetch)
+            jwk_set = jwt.PyJWKSet.from_dict(data)
+        except Exception:
+            logger.exception("Не удалось загрузить JWKS из %s", self.url)
+            self._fetched_at = time.monotonic() - self.ttl + MIN_REFRESH_INTERVAL
+            return
+        self._keys = {jwk.key_id: jwk.key for jwk in jwk_set.keys}
+        self._fetched_at = time.monotonic()
+        logger.info("Загружено ключей JWKS: %d", len(self._keys))
+
+    def _fetch(self) -> dict:
+        with urllib.request.urlopen(self.url, timeout=5) as response:
+            return json.load(response)
@@ -0,0 +1,121 @@
+"""
+Журнал проводок двойной записи.
+
+Проводки пишутся в той же транзакции БД, что и перевод, при заблокированных
+счетах, поэтому `balance_after` последовательных проводок счета образует
+непрерывную цепочку балансов. Время проводки задается часами БД в момент
+вставки, под блокировкой счета, поэтому порядок `(created_at, id)` проводок
+счета совпадает с порядком блокировок и с цепочкой балансов независимо от
+часов воркеров. Переводы, проведенные до появления журнала, перенесены в него
+миграцией с балансами, восстановленными от текущих; переводы, архивированные
+до этого, в журнал не попали.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from common.models.ledger import LedgerEntry
+from common.models.transaction import Transaction
+from common.models.user import User
+
+
+async def write_entries(db: AsyncSession, transaction: Transaction,
+                        sender: User, receiver: User) -> None:
+    """
+    Записывает списание и зачисление по переводу одним INSERT.
+
+    Вызывается после изменения балансов заблокированных счетов и `flush`
+    транзакции, чтобы был известен ее ID.
+    """
+    created_at = func.timezone("UTC", func.clock_timestamp())
+    await db.execute(insert(LedgerEntry).values([
+        {"transaction_id": transaction.id, "account_id": sender.id,
+         "currency": transaction.currency, "amount": -transaction.amount,
+         "balance_after": sender.balance, "created_at": created_at},
+        {"transaction_id": transaction.id, "account_id": receiver.id,
+         "currency": transaction.currency, "amount": transaction.amount,
+         "balance_after": receiver.balance, "created_at": created_at},
+    ]))
+
+
+async def balance_at(db: AsyncSession, user: User, at: datetime,
+                     inclusive: bool = True) -> int:
+    """
+    Баланс счета на момент времени в минимальных единицах валюты.
+
+    Берется `balance_after` последней проводки не позже `at` (при
+    `inclusive=False` — строго раньше `at`, то есть входящий баланс периода,
+    начинающегося в `at`). Если таких проводок нет, баланс восстанавливается
+    по первой последующей проводке, а если проводок нет вовсе — равен
+    текущему балансу счета: журнал содержит все переводы, кроме
+    архивированных до его появления.
+    """
+    result = await db.execute(
+        select(LedgerEntry.balance_after)
+        .where(LedgerEntry.account_id == user.id,
+               LedgerEntry.created_at <= at if inclusive else LedgerEntry.created_at < at)
+        .order_by(LedgerEntry.created_at.desc(), LedgerEntry.id.desc())
+        .limit(1)
+    )
+    balance = result.scalar_one_or_none()
+    if balance is not None:
+        return balance
+
+    result = await db.execute(
+        select(LedgerEntry.balance_after - LedgerEntry.amount)
+        .where(LedgerEntry.account_id == user.id,
+               LedgerEntry.created_at > at if inclusive else LedgerEntry.created_at >= at)
+        .order_by(LedgerEntry.created_at, LedgerEntry.id)
+        .limit(1)
+    )
+    balance = result.scalar_one_or_none()
+    return user.balance if balance is None else balance
+
+
+def entries_query(account_id: int, start: Optional[datetime], end: Optional[datetime],
+                  after: Optional[Tuple[datetime, int]] = None):
+    """
+    Запрос проводок счета за период `[start, end)` в хронологическом порядке.
+
+    Читает диапазон индекса `(account_id, created_at, id)`, который включает
+    все выбираемые столбцы, поэтому запрос выполняется index-only scan без
+    обращения к таблице (для страниц, отмеченных в visibility map). `after` —
+    позиция последней прочитанной проводки для продолжения с нее.
+    """
+    query = (
+        select(LedgerEntry)
+        .where(LedgerEntry.account_id == account_id)
+        .order_by(LedgerEntry.created_at, LedgerEntry.id)
+    )
+    if start is not None:
+        query = query.where(LedgerEntry.created_at >= start)
+    if end is not None:
+        query = query.where(LedgerEntry.created_at < end)
+    if after is not None:
+        query = query.where(tuple_(LedgerEntry.created_at, LedgerEntry.id) > tuple_(*after))
+    return query
+
+
+def encode_cursor(entry: LedgerEntry) -> str:
+    """
+    Кодирование позиции проводки (`created_at|id` в base64).
+    """
+    value = f"{entry.created_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Декодирование позиции проводки.
+
+    Исключения:
+    - ValueError: Если курсор некорректен.
+    """
+    try:
+        created_at, _, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Некорректный курсор")
@@ -0,0 +1,214 @@
+"""
+Лимиты исходящих переводов по скользящим окнам.
+
+Суммы и количество переводов счета за каждое окно хранятся в памяти процесса
+и обновляются инкрементально. Окна счета заполняются из таблицы транзакций при
+первом обращении. Перед каждой проверкой, при заблокированной строке
+отправителя, читаются только его переводы после последнего учтенного этим
+процессом (их провели другие воркеры): переводы одного отправителя проводятся
+последовательно под блокировкой его строки, поэтому их ID возрастают, а
+диапазон индекса `(sender_id, created_at)` ограничен временем последнего
+учтенного перевода с запасом `CLOCK_SKEW` на расхождение часов воркеров.
+Правила из `transfer_limits` кэшируются на `LIMITS_CACHE_TTL` секунд.
+"""
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.config import settings
+from app.schemas import TransactionStatus
+from common.models.limit import TransferLimit
+from common.models.transaction import Transaction
+from common.money import from_minor
+
+# Допустимое расхождение часов воркеров, задающих время транзакций.
+CLOCK_SKEW = timedelta(seconds=5)
+
+
+class Limit(NamedTuple):
+    """
+    Правило лимита для одного окна.
+    """
+    window_seconds: int
+    max_amount: Optional[int]
+    max_count: Optional[int]
+
+
+class LimitExceeded(Exception):
+    """
+    Исключение при превышении лимита исходящих переводов.
+    """
+
+
+class WindowAggregate:
+    """
+    Сумма и количество переводов за последние `seconds` секунд.
+    """
+    __slots__ = ("seconds", "entries", "amount", "count")
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.entries: Deque[Tuple[float, int]] = deque()
+        self.amount = 0
+        self.count = 0
+
+    def add(self, timestamp: float, amount: int) -> None:
+        """
+        Учитывает перевод.
+        """
+        self.entries.append((timestamp, amount))
+        self.amount += amount
+        self.count += 1
+
+    def evict(self, now: float) -> None:
+        """
+        Исключает переводы, вышедшие за пределы окна.
+        """
+        cutoff = now - self.seconds
+        while self.entries and self.entries[0][0] <= cutoff:
+            _, amount = self.entries.popleft()
+            self.amount -= amount
+            self.count -= 1
+
+
+class AccountWindows:
+    """
+    Окна одного счета.
+    """
+    __slots__ = ("windows", "last_id", "last_at")
+
+    def __init__(self, seconds):
+        self.windows = {window: WindowAggregate(window) for window in seconds}
+        self.last_id = 0
+        self.last_at = datetime.min
+
+    def add(self, transaction_id: int, created_at: datetime, amount: int) -> None:
+        """
+        Учитывает перевод во всех окнах, если он еще не учтен.
+        """
+        if transaction_id <= self.last_id:
+            return
+        timestamp = _timestamp(created_at)
+        for window in self.windows.values():
+            window.add(timestamp, amount)
+        self.last_id = transaction_id
+        self.last_at = max(self.last_at, created_at)
+
+
+def _timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class LimitRegistry:
+    """
+    Реестр правил и окон исходящих переводов.
+    """
+
+    def __init__(self):
+        self._defaults: Dict[str, Dict[int, Limit]] = {}
+        self._overrides: Dict[Tuple[int, str], Dict[int, Limit]] = {}
+        self._rules_loaded_at = float("-inf")
+        self._accounts: "OrderedDict[int, AccountWindows]" = OrderedDict()
+
+    async def check(self, db: AsyncSession, user_id: int, currency: str, amount: int) -> None:
+        """
+        Проверяет, что перевод не превысит лимиты счета.
+
+        Вызывается при заблокированной строке отправителя, поэтому параллельные
+        переводы одного счета, в том числе на разных воркерах, проверяются
+        последовательно и видят переводы друг друга.
+
+        Исключения:
+        - LimitExceeded: Если перевод превысит лимит суммы или количества.
+        """
+        rules = await self._rules(db, user_id, currency)
+        if not rules:
+            return
+
+        now = time.time()
+        account = await self._account(db, user_id, rules, now)
+        for rule in rules.values():
+            window = account.windows[rule.window_seconds]
+            window.evict(now)
+            if rule.max_amount is not None and window.amount + amount > rule.max_amount:
+                raise LimitExceeded(
+                    f"Превышен лимит переводов: не более "
+                    f"{from_minor(rule.max_amount, currency)} {currency} "
+                    f"за {rule.window_seconds} секунд"
+                )
+            if rule.max_count is not None and window.count + 1 > rule.max_count:
+                raise LimitExceeded(
+                    f"Превышен лимит переводов: не более {rule.max_count} "
+                    f"за {rule.window_seconds} секунд"
+                )
+
+    def record(self, user_id: int, transaction_id: int, amount: int,
+               created_at: datetime) -> None:
+        """
+        Учитывает зафиксированный перевод в окнах счета, если они загружены.
+        """
+        account = self._accounts.get(user_id)
+        if account is not None:
+            account.add(transaction_id, created_at, amount)
+
+    async def _rules(self, db: AsyncSession, user_id: int, currency: str) -> Dict[int, Limit]:
+        if time.monotonic() - self._rules_loaded_at >= settings.LIMITS_CACHE_TTL:
+            await self._load_rules(db)
+        rules = self._defaults.get(currency, {})
+        overrides = self._overrides.get((user_id, currency))
+        if overrides:
+            rules = {**rules, **overrides}
+        return rules
+
+    async def _load_rules(self, db: AsyncSession) -> None:
+        result = await db.execute(select(TransferLimit))
+        defaults: Dict[str, Dict[int, Limit]] = {}
+        overrides: Dict[Tuple[int, str], Dict[int, Limit]] = {}
+        for row in result.scalars():
+            limit = Limit(row.window_seconds, row.max_amount, row.max_count)
+            if row.user_id is None:
+                defaults.setdefault(row.currency, {})[row.window_seconds] = limit
+            else:
+                overrides.setdefault((row.user_id, row.currency), {})[row.window_seconds] = limit
+        self._defaults = defaults
+        self._overrides = overrides
+        self._rules_loaded_at = time.monotonic()
+
+    async def _account(self, db: AsyncSession, user_id: int,
+                       rules: Dict[int, Limit], now: float) -> AccountWindows:
+        account = self._accounts.get(user_id)
+        if account is None or account.windows.keys() != rules.keys():
+            account = AccountWindows(rules.keys())
+            self._accounts[user_id] = account
+            if len(self._accounts) > settings.LIMITS_MAX_ACCOUNTS:
+                self._accounts.popitem(last=False)
+        self._accounts.move_to_end(user_id)
+        await self._sync(db, user_id, account, now)
+        return account
+
+    async def _sync(self, db: AsyncSession, user_id: int, account: AccountWindows,
+                    now: float) -> None:
+        """
+        Дочитывает переводы счета, не учтенные в окнах этим процессом.
+
+        Для новых окон читаются все переводы за самое длинное окно.
+        """
+        since = datetime.utcfromtimestamp(now - max(account.windows))
+        if account.last_id:
+            since = max(since, account.last_at - CLOCK_SKEW)
+        result = await db.execute(
+            select(Transaction.id, Transaction.created_at, Transaction.amount)
+            .where(Transaction.sender_id == user_id,
+                   Transaction.created_at > since,
+                   Transaction.id > account.last_id,
+                   Transaction.status == TransactionStatus.COMPLETED,
+                   Transaction.parent_id.is_(None))
+            .order_by(Transaction.id)
+        )
+        for transaction_id, created_at, amount in result:
+            account.add(transaction_id, created_at, amount)
+
+
+registry = LimitRegistry()
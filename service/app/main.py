@@ -1,20 +1,67 @@
 """
 Модуль для инициализации и настройки приложения FastAPI.
 """
+import asyncio
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from sqlalchemy.future import select
+from app import events, scheduler
+from app.config import settings
 from app.database import engine
-from app.routes import transaction
-from common.models.base import Base
+from app.utils import decode_token
+from app.routes import ledger, schedule, transaction
+from common import health
+from common.models.transaction import Transaction
+from common.models.user import User
+from common.db_profiling import QueryStatsMiddleware
 from common.logging_config import setup_logging
+from common.rate_limit import RateLimitMiddleware
+from common.startup import check_alembic_head, warm_up_until_ready
 
 setup_logging()
 
-app = FastAPI()
+WARMUP_STATEMENTS = [
+    select(User).filter(User.username == ""),
+    # Несуществующий ID и SKIP LOCKED: прогрев не блокирует реальные счета.
+    select(User).where(User.id.in_([-1])).order_by(User.id).with_for_update(skip_locked=True),
+    select(Transaction).offset(0).limit(10),
+]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Проверяет схему БД при старте, прогревает пул в фоне, подписывается
+    на события, запускает планировщик переводов и освобождает ресурсы при остановке.
+    """
+    app.state.ready = False
+    app.state.started_at = time.monotonic()
+    app.state.engine = engine
+    if settings.CHECK_MIGRATIONS:
+        await check_alembic_head(engine)
+    await events.broker.start()
+    warmup = asyncio.create_task(
+        warm_up_until_ready(app, engine, settings.DB_WARMUP_CONNECTIONS, WARMUP_STATEMENTS)
+    )
+    tasks = [warmup]
+    if settings.SCHEDULER_ENABLED:
+        tasks.append(asyncio.create_task(scheduler.run_scheduler()))
+    yield
+    app.state.ready = False
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await events.broker.stop()
+    await engine.dispose()
 
-app.include_router(transaction.router, prefix="/transactions", tags=["Transactions"])
\ No newline at end of file
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RateLimitMiddleware,
+                   limits=settings.RATE_LIMITS,
+                   decode_token=decode_token,
+                   concurrency=settings.RATE_LIMIT_CONCURRENCY)
+app.add_middleware(QueryStatsMiddleware, headers=settings.DEBUG)
+
+app.include_router(transaction.router, prefix="/transactions", tags=["Transactions"])
+app.include_router(schedule.router, prefix="/transactions/schedules", tags=["Schedules"])
+app.include_router(ledger.router, prefix="/transactions/ledger", tags=["Ledger"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
@@ -0,0 +1,184 @@
+"""
+Ретранслятор транзакционного outbox во внешние приемники.
+
+Запуск:
+    python -m app.outbox [--sink stdout|file:<путь>|<модуль>:<класс>] [--once]
+
+Ретранслятор забирает пачку событий через `FOR UPDATE SKIP LOCKED`, передает
+ее приемнику и удаляет доставленные события в той же транзакции. Если приемник
+упал, транзакция откатывается и события будут доставлены повторно (at-least-once).
+Идентификатор события (`offset`) уникален, но не упорядочен по времени
+фиксации: значения последовательности выдаются при вставке, а транзакции
+фиксируются в другом порядке, поэтому событие с меньшим ID может появиться
+после доставки события с большим. Потребитель отбрасывает дубли по множеству
+уже обработанных ID (например, по уникальному ключу в своей БД), а не по
+условию `id <= последнего смещения`. Максимальный доставленный ID сохраняется
+в `outbox_offsets` только для мониторинга продвижения ретранслятора.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import sys
+from typing import List
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from app.config import settings
+from app.database import AsyncSessionLocal
+from common.logging_config import setup_logging
+from common.models.outbox import OutboxEvent, OutboxOffset
+
+logger = logging.getLogger(__name__)
+
+
+class Sink:
+    """
+    Базовый класс приемника событий.
+    """
+
+    async def send(self, events: List[OutboxEvent]) -> None:
+        """
+        Доставляет пачку событий. Исключение означает, что пачка не доставлена.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def serialize(event: OutboxEvent) -> str:
+        """
+        Сериализует событие в строку NDJSON.
+        """
+        return json.dumps({
+            "offset": event.id,
+            "topic": event.topic,
+            "payload": event.payload,
+            "created_at": event.created_at.isoformat() if event.created_at else None,
+        })
+
+
+class StdoutSink(Sink):
+    """
+    Приемник, печатающий события в стандартный вывод.
+    """
+
+    async def send(self, events: List[OutboxEvent]) -> None:
+        sys.stdout.write("".join(self.serialize(event) + "\n" for event in events))
+        sys.stdout.flush()
+
+
+class FileSink(Sink):
+    """
+    Приемник, дописывающий события в файл в формате NDJSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def send(self, events: List[OutboxEvent]) -> None:
+        lines = "".join(self.serialize(event) + "\n" for event in events)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def load_sink(spec: str) -> Sink:
+    """
+    Создает приемник по строке конфигурации.
+
+    Параметры:
+    - spec (str): `stdout`, `file:<путь>` или `<модуль>:<класс>` для своего приемника.
+
+    Возвращает:
+    - Sink: Экземпляр приемника.
+    """
+    if spec == "stdout":
+        return StdoutSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Неизвестный приемник outbox: {spec}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+async def drain_batch(sink: Sink, consumer: str) -> int:
+    """
+    Доставляет одну пачку событий.
+
+    Параметры:
+    - sink (Sink): Приемник событий.
+    - consumer (str): Имя ретранслятора для учета смещения.
+
+    Возвращает:
+    - int: Количество доставленных событий.
+    """
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            result = await db.execute(
+                select(OutboxEvent)
+                .order_by(OutboxEvent.id)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            batch = result.scalars().all()
+            if not batch:
+                return 0
+
+            await sink.send(batch)
+
+            await db.execute(
+                delete(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in batch]))
+            )
+            last_event_id = batch[-1].id
+            offset = insert(OutboxOffset).values(consumer=consumer,
+                                                 last_event_id=last_event_id)
+            await db.execute(offset.on_conflict_do_update(
+                index_elements=[OutboxOffset.consumer],
+                set_={"last_event_id": func.greatest(OutboxOffset.last_event_id,
+                                                     offset.excluded.last_event_id),
+                      "updated_at": func.now()},
+            ))
+    logger.info("Доставлено событий outbox: %d, максимальный ID %d", len(batch), last_event_id)
+    return len(batch)
+
+
+async def run_relay(sink: Sink, consumer: str, once: bool = False) -> None:
+    """
+    Доставляет события, пока они есть, затем ждет `OUTBOX_POLL_INTERVAL` секунд.
+
+    Параметры:
+    - sink (Sink): Приемник событий.
+    - consumer (str): Имя ретранслятора для учета смещения.
+    - once (bool): Завершиться, когда outbox опустеет.
+    """
+    while True:
+        try:
+            delivered = await drain_batch(sink, consumer)
+        except Exception:
+            logger.exception("Ошибка доставки событий outbox")
+            delivered = 0
+            if once:
+                raise
+        if delivered:
+            continue
+        if once:
+            return
+        await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL)
+
+
+def main() -> None:
+    """
+    Точка входа ретранслятора.
+    """
+    parser = argparse.ArgumentParser(description="Ретранслятор outbox")
+    parser.add_argument("--sink", default=settings.OUTBOX_SINK)
+    parser.add_argument("--consumer", default=settings.OUTBOX_CONSUMER)
+    parser.add_argument("--once", action="store_true",
+                        help="завершиться, когда outbox опустеет")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(run_relay(load_sink(args.sink), args.consumer, once=args.once))
+
+
+if __name__ == "__main__":
+    main()
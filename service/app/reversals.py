@@ -0,0 +1,114 @@
+"""
+Массовый возврат транзакций для устранения последствий инцидентов.
+
+Запуск:
+    python -m app.reversals 101 102 103 [--allow-overdraft] [--concurrency 8]
+    python -m app.reversals --file ids.txt
+
+Каждая транзакция возвращается полностью (на невозвращенный остаток) в
+отдельной транзакции БД через `settle_reversal`, не больше `--concurrency`
+одновременно. Конфликты параллельных транзакций повторяются после короткой
+случайной паузы, прочие ошибки БД учитываются как `failed` и не прерывают
+остальные возвраты. Уже полностью возвращенные транзакции пропускаются,
+поэтому команду можно безопасно запускать повторно.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+from typing import Dict, Iterable
+from sqlalchemy.exc import DBAPIError
+from app.database import AsyncSessionLocal
+from app.settlement import (AlreadyReversed, TransferError, is_retryable, settle_reversal,
+                            transfer_committed)
+from common.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Количество повторов при конфликте параллельных транзакций.
+RETRIES = 3
+# Базовая пауза перед повтором в секундах, удваивается с каждой попыткой.
+RETRY_DELAY = 0.05
+
+
+async def reverse_one(transaction_id: int, allow_overdraft: bool) -> str:
+    """
+    Возвращает одну транзакцию.
+
+    Возвращает:
+    - str: Итог: `reversed`, `skipped`, `failed` или `conflict`.
+    """
+    for attempt in range(RETRIES):
+        async with AsyncSessionLocal() as db:
+            try:
+                compensation, event = await settle_reversal(
+                    db, transaction_id, allow_overdraft=allow_overdraft
+                )
+                await db.commit()
+            except AlreadyReversed:
+                return "skipped"
+            except TransferError as error:
+                logger.warning("Транзакция %d не возвращена: %s", transaction_id, error.detail)
+                return "failed"
+            except DBAPIError as error:
+                if not is_retryable(error):
+                    logger.exception("Транзакция %d не возвращена: ошибка БД", transaction_id)
+                    return "failed"
+                compensation = None
+        if compensation is None:
+            await asyncio.sleep(random.uniform(0, RETRY_DELAY * 2 ** attempt))
+            continue
+        transfer_committed(compensation, event)
+        logger.info("Транзакция %d возвращена транзакцией %d", transaction_id, compensation.id)
+        return "reversed"
+    logger.warning("Транзакция %d не возвращена: конфликт параллельных операций", transaction_id)
+    return "conflict"
+
+
+async def reverse_many(transaction_ids: Iterable[int], allow_overdraft: bool,
+                       concurrency: int) -> Dict[str, int]:
+    """
+    Возвращает транзакции с ограниченной параллельностью.
+
+    Возвращает:
+    - Dict[str, int]: Количество транзакций по итогам.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = {"reversed": 0, "skipped": 0, "failed": 0, "conflict": 0}
+
+    async def bounded(transaction_id: int) -> None:
+        async with semaphore:
+            summary[await reverse_one(transaction_id, allow_overdraft)] += 1
+
+    await asyncio.gather(*(bounded(transaction_id) for transaction_id in transaction_ids))
+    return summary
+
+
+def main() -> None:
+    """
+    Точка входа массового возврата.
+    """
+    parser = argparse.ArgumentParser(description="Массовый возврат транзакций")
+    parser.add_argument("ids", nargs="*", type=int, help="ID транзакций")
+    parser.add_argument("--file", help="файл с ID транзакций, по одному в строке (- для stdin)")
+    parser.add_argument("--allow-overdraft", action="store_true",
+                        help="разрешить отрицательный баланс получателя")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    transaction_ids = list(args.ids)
+    if args.file:
+        with (sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")) as file:
+            transaction_ids.extend(int(line) for line in file if line.strip())
+    if not transaction_ids:
+        parser.error("не указаны ID транзакций")
+
+    setup_logging()
+    summary = asyncio.run(reverse_many(dict.fromkeys(transaction_ids),
+                                       args.allow_overdraft, args.concurrency))
+    logger.info("Итог массового возврата: %s", summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Маршруты для работы с журналом проводок.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import ledger, schemas, statements
+from app.statements import StatementFormat
+from app.utils import get_current_user, get_db
+from common.models.user import User
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Приводит время к UTC без часового пояса, как оно хранится в БД.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@router.get("/balance", response_model=schemas.BalanceResponse)
+async def get_balance(
+    at: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.BalanceResponse:
+    """
+    Получение баланса текущего пользователя на момент времени.
+
+    - Параметры:
+        - `at`: Момент времени (по умолчанию текущий).
+
+    - Ответ:
+        - Возвращает баланс после последней проводки не позже `at`.
+    """
+    at = naive_utc(at) or datetime.utcnow()
+    logger.info("Баланс пользователя %s на %s", current_user.username, at)
+    balance = await ledger.balance_at(db, current_user, at)
+    return schemas.BalanceResponse(currency=current_user.currency, balance=balance, at=at)
+
+@router.get("", response_model=schemas.LedgerPage)
+async def get_entries(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.LedgerPage:
+    """
+    Получение проводок текущего пользователя в хронологическом порядке.
+
+    - Параметры:
+        - `start_date`: Начало периода включительно (опционально).
+        - `end_date`: Конец периода, не включая его (опционально).
+        - `limit`: Размер страницы (по умолчанию 100, не больше 1000).
+        - `cursor`: Курсор следующей страницы из предыдущего ответа.
+
+    - Ответ:
+        - Возвращает страницу проводок с балансом после каждой из них и курсор
+          следующей страницы (`null` на последней странице).
+
+    - Ошибки:
+        - 400: Если курсор некорректен.
+    """
+    after = None
+    if cursor:
+        try:
+            after = ledger.decode_cursor(cursor)
+        except ValueError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=str(error))
+
+    query = ledger.entries_query(current_user.id, naive_utc(start_date),
+                                 naive_utc(end_date), after).limit(limit + 1)
+    entries = (await db.execute(query)).scalars().all()
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = ledger.encode_cursor(entries[-1])
+    logger.info("Найдено проводок пользователя %s: %d", current_user.username, len(entries))
+    return {"items": entries, "next_cursor": next_cursor}
+
+@router.get("/statement")
+async def get_statement(
+    period: str,
+    fmt: StatementFormat = Query(StatementFormat.JSON, alias="format"),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Выписка текущего пользователя за календарный месяц.
+
+    - Параметры:
+        - `period`: Месяц в формате `ГГГГ-ММ`.
+        - `format`: `json` (по умолчанию) или `csv`.
+
+    - Ответ:
+        - Поток с входящим балансом, проводками за месяц и исходящим балансом.
+
+    - Ошибки:
+        - 400: Если период некорректен.
+    """
+    try:
+        period_start = statements.parse_period(period)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(error))
+
+    logger.info("Выписка пользователя %s за %s в формате %s",
+                current_user.username, period, fmt.value)
+    media_type = "text/csv" if fmt == StatementFormat.CSV else "application/json"
+    filename = f"statement-{period}.{fmt.value}"
+    return StreamingResponse(statements.stream_statement(current_user, period_start, fmt),
+                             media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -0,0 +1,159 @@
+"""
+Маршруты для работы с запланированными переводами.
+"""
+from typing import List
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app import schemas
+from app.utils import get_current_user, get_db
+from common.models.schedule import ScheduledTransfer, ScheduledTransferRun
+from common.models.user import User
+from common.money import to_minor
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def get_own_schedule(schedule_id: int, current_user: User,
+                           db: AsyncSession) -> ScheduledTransfer:
+    """
+    Получение расписания текущего пользователя.
+
+    Исключения:
+    - HTTPException: 404, если расписание не найдено или принадлежит другому пользователю.
+    """
+    schedule = await db.get(ScheduledTransfer, schedule_id)
+    if schedule is None or schedule.sender_id != current_user.id:
+        logger.warning("Расписание %d не найдено для пользователя %s",
+                       schedule_id, current_user.username)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Расписание не найдено")
+    return schedule
+
+@router.post("", response_model=schemas.ScheduleResponse)
+async def create_schedule(
+    data: schemas.ScheduleCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.ScheduleResponse:
+    """
+    Создание разового или периодического перевода по расписанию.
+
+    - Параметры:
+        - `data`: Получатель, сумма, время первого запуска, интервал в секундах
+          (не задан — разовый перевод) и политика навёрстывания пропущенных запусков.
+
+    - Ответ:
+        - Возвращает созданное расписание.
+
+    - Ошибки:
+        - 400: Если получатель совпадает с отправителем, валюты не совпадают
+          или сумма некорректна.
+        - 404: Если получатель не найден.
+    """
+    logger.info("Создание расписания перевода пользователем %s", current_user.username)
+    if data.receiver_id == current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Нельзя перевести средства самому себе")
+
+    receiver = await db.get(User, data.receiver_id)
+    if receiver is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Получатель не найден")
+
+    currency = data.currency or current_user.currency
+    if currency != current_user.currency or currency != receiver.currency:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Валюты счетов отправителя и получателя не совпадают")
+
+    try:
+        amount = to_minor(data.amount, currency)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(error))
+
+    schedule = ScheduledTransfer(
+        sender_id=current_user.id,
+        receiver_id=receiver.id,
+        amount=amount,
+        currency=currency,
+        interval_seconds=data.interval_seconds,
+        next_run_at=data.start_at,
+        catch_up=data.catch_up,
+        is_active=True
+    )
+    db.add(schedule)
+    await db.commit()
+    await db.refresh(schedule)
+    logger.info("Расписание %d создано", schedule.id)
+    return schedule
+
+@router.get("", response_model=list[schemas.ScheduleResponse])
+async def get_schedules(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> List[schemas.ScheduleResponse]:
+    """
+    Получение расписаний переводов текущего пользователя.
+    """
+    result = await db.execute(
+        select(ScheduledTransfer)
+        .where(ScheduledTransfer.sender_id == current_user.id)
+        .order_by(ScheduledTransfer.id)
+    )
+    return result.scalars().all()
+
+@router.delete("/{schedule_id}", response_model=schemas.ScheduleResponse)
+async def cancel_schedule(
+    schedule_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.ScheduleResponse:
+    """
+    Отмена расписания и еще не выполненных запусков.
+
+    - Ошибки:
+        - 404: Если расписание не найдено.
+    """
+    schedule = await get_own_schedule(schedule_id, current_user, db)
+    schedule.is_active = False
+    await db.execute(
+        update(ScheduledTransferRun)
+        .where(ScheduledTransferRun.schedule_id == schedule.id,
+               ScheduledTransferRun.status == "pending")
+        .values(status="cancelled")
+    )
+    await db.commit()
+    logger.info("Расписание %d отменено", schedule.id)
+    return schedule
+
+@router.get("/{schedule_id}/runs", response_model=list[schemas.ScheduleRunResponse])
+async def get_schedule_runs(
+    schedule_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> List[schemas.ScheduleRunResponse]:
+    """
+    Получение истории запусков расписания, начиная с последних.
+
+    - Параметры:
+        - `skip`: Количество пропускаемых запусков (по умолчанию 0).
+        - `limit`: Максимальное количество возвращаемых запусков (по умолчанию 10).
+
+    - Ошибки:
+        - 404: Если расписание не найдено.
+    """
+    await get_own_schedule(schedule_id, current_user, db)
+    result = await db.execute(
+        select(ScheduledTransferRun)
+        .where(ScheduledTransferRun.schedule_id == schedule_id)
+        .order_by(ScheduledTransferRun.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
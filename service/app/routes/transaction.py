@@ -4,12 +4,18 @@
 from datetime import datetime, time
 from typing import Optional, List
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app import schemas
+from starlette.concurrency import run_in_threadpool
+from app import archive, events, schemas
+from app.settlement import (TransferError, is_retryable, settle_reversal, settle_transfer,
+                            transfer_committed)
 from app.utils import get_current_user, get_db
 from common.models.user import User
+from common.money import to_minor
 from common.models.transaction import Transaction
 
 logger = logging.getLogger(__name__)
@@ -32,54 +38,145 @@ async def create_transaction(
         - Возвращает информацию о созданной транзакции.
 
     - Ошибки:
-        - 400: Если пользователь пытается перевести средства самому себе или недостаточно средств.
+        - 400: Если пользователь пытается перевести средства самому себе, валюты
+          не совпадают, сумма некорректна, недостаточно средств или превышен лимит.
         - 404: Если получатель не найден.
+        - 409: Если перевод конфликтует с параллельной операцией над теми же счетами.
     """
     logger.info("Попытка создания транзакции от пользователя %s", current_user.username)
 
-    if current_user.id == transaction.receiver_id:
-        logger.warning("Пользователь %s пытается перевести средства самому себе", current_user.username)
+    currency = transaction.currency or current_user.currency
+    try:
+        amount = to_minor(transaction.amount, currency)
+    except ValueError as error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Нельзя перевести средства самому себе")
+                            detail=str(error))
+
+    try:
+        new_transaction, event = await settle_transfer(
+            db, current_user.id, transaction.receiver_id, amount, currency
+        )
+        await db.commit()
+    except TransferError as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+    except DBAPIError as error:
+        if not is_retryable(error):
+            raise
+        logger.warning("Конфликт параллельных переводов пользователя %s", current_user.username)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Конфликт параллельных операций, повторите запрос")
+    transfer_committed(new_transaction, event)
+
+    logger.info("Транзакция успешно создана: %d", new_transaction.id)
+    return new_transaction
 
-    receiver = await db.execute(select(User).filter(User.id == transaction.receiver_id))
-    receiver = receiver.scalar_one_or_none()
-    if not receiver:
-        logger.warning("Получатель с ID %d не найден", transaction.receiver_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Получатель не найден")
+@router.post("/{transaction_id}/reverse", response_model=schemas.TransactionResponse)
+async def reverse_transaction(
+    transaction_id: int,
+    reversal: schemas.ReversalCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.TransactionResponse:
+    """
+    Полный или частичный возврат полученного перевода.
 
-    if current_user.balance < transaction.amount:
-        logger.warning("Недостаточно средств у пользователя %s", current_user.username)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Недостаточно средств")
+    Создает компенсирующую транзакцию от текущего пользователя (получателя
+    исходного перевода) к отправителю со ссылкой на исходную транзакцию.
 
-    new_transaction = Transaction(
-        sender_id=current_user.id,
-        receiver_id=transaction.receiver_id,
-        amount=transaction.amount,
-        status=schemas.TransactionStatus.COMPLETED
-    )
+    - Параметры:
+        - `transaction_id`: ID исходной транзакции.
+        - `reversal`: Сумма возврата (по умолчанию весь невозвращенный остаток).
+
+    - Ответ:
+        - Возвращает компенсирующую транзакцию.
+
+    - Ошибки:
+        - 400: Если сумма превышает невозвращенный остаток, транзакция сама
+          является возвратом или недостаточно средств.
+        - 404: Если транзакция не найдена или получена другим пользователем.
+        - 409: Если возврат конфликтует с параллельной операцией.
+    """
+    logger.info("Попытка возврата транзакции %d пользователем %s",
+                transaction_id, current_user.username)
+    original = await db.get(Transaction, transaction_id)
+    if original is None or original.receiver_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Транзакция не найдена")
+
+    amount = None
+    if reversal.amount is not None:
+        try:
+            amount = to_minor(reversal.amount, original.currency)
+        except ValueError as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=str(error))
+
+    try:
+        compensation, event = await settle_reversal(db, transaction_id, amount)
+        await db.commit()
+    except TransferError as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+    except DBAPIError as error:
+        if not is_retryable(error):
+            raise
+        logger.warning("Конфликт параллельных операций при возврате %d", transaction_id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Конфликт параллельных операций, повторите запрос")
+    transfer_committed(compensation, event)
+
+    logger.info("Транзакция %d возвращена транзакцией %d", transaction_id, compensation.id)
+    return compensation
+
+@router.get("/events")
+async def stream_events(
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Поток событий о переводах текущего пользователя (Server-Sent Events).
 
-    await db.execute(
-        select(User).filter(User.id == current_user.id).execution_options(synchronize_session="fetch")
-    )
-    current_user.balance -= transaction.amount
+    - Ответ:
+        - Поток `text/event-stream`, в котором каждое событие `transfer` содержит
+          данные транзакции и обновленный баланс пользователя.
 
-    await db.execute(
-        select(User).filter(User.id == receiver.id).execution_options(synchronize_session="fetch")
-    )
-    receiver.balance += transaction.amount
+    - Ошибки:
+        - 401: Если токен недействителен.
+    """
+    logger.info("Подписка на события пользователя %s", current_user.username)
+    return StreamingResponse(events.stream(current_user.id),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache",
+                                      "X-Accel-Buffering": "no"})
+
+@router.get("/archive", response_model=list[schemas.TransactionResponse])
+async def get_archived_transactions(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+) -> List[schemas.TransactionResponse]:
+    """
+    Получение архивированных транзакций текущего пользователя.
 
-    db.add(new_transaction)
-    db.add(current_user)
-    db.add(receiver)
+    Транзакции старше срока хранения переносятся командой `python -m app.archive`
+    в холодное хранилище и больше не возвращаются основным списком.
 
-    await db.commit()
-    await db.refresh(new_transaction)
+    - Параметры:
+        - `start_date`: Начальная дата периода включительно (опционально).
+        - `end_date`: Конечная дата периода включительно (опционально).
+        - `limit`: Максимальное количество транзакций (по умолчанию 100, не больше 1000).
 
-    logger.info("Транзакция успешно создана: %s -> %s, сумма: %.2f", current_user.username, receiver.username, transaction.amount)
-    return new_transaction
+    - Ответ:
+        - Возвращает архивированные транзакции, в которых пользователь является
+          отправителем или получателем, в порядке возрастания ID.
+    """
+    start = end = None
+    if start_date:
+        start = datetime.combine(start_date, time.min)
+    if end_date:
+        end = datetime.combine(end_date, time.max)
+    logger.info("Чтение архива транзакций пользователя %s: start=%s, end=%s",
+                current_user.username, start, end)
+    return await run_in_threadpool(archive.read_archived, current_user.id, start, end, limit)
 
 @router.get("/transactions", response_model=list[schemas.TransactionResponse])
 async def get_transactions(
@@ -0,0 +1,208 @@
+"""
+Планировщик запланированных и периодических переводов.
+
+Работает в фоне в каждом воркере сервиса. Каждый цикл состоит из двух шагов:
+
+1. Выборка наступивших расписаний пачкой через `FOR UPDATE SKIP LOCKED`:
+   для каждого создаются запуски со статусом `pending` согласно политике
+   навёрстывания и сдвигается `next_run_at`.
+2. Выполнение ожидающих запусков с ограниченной параллельностью. Каждый
+   запуск проводится через `settle_transfer` в отдельной транзакции БД
+   вместе с обновлением его статуса.
+
+Запуски, не выполненные из-за сбоя воркера, остаются в `pending` и будут
+подхвачены следующим циклом любого воркера.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.schemas import CatchUpPolicy
+from app.settlement import TransferError, is_retryable, settle_transfer, transfer_committed
+from common.models.schedule import ScheduledTransfer, ScheduledTransferRun
+
+logger = logging.getLogger(__name__)
+
+
+def due_times(schedule: ScheduledTransfer, now: datetime) -> List[datetime]:
+    """
+    Вычисляет моменты запуска, которые нужно выполнить, с учетом политики навёрстывания.
+
+    - `all`: все пропущенные запуски (не больше `SCHEDULER_MAX_CATCH_UP` последних).
+    - `once`: один запуск вместо всех пропущенных.
+    - `skip`: только последний запуск и только если он опоздал не больше чем
+      на `SCHEDULER_MISFIRE_GRACE` секунд.
+
+    Параметры:
+    - schedule (ScheduledTransfer): Расписание с наступившим `next_run_at`.
+    - now (datetime): Текущее время (UTC).
+
+    Возвращает:
+    - List[datetime]: Моменты запуска в порядке возрастания.
+    """
+    if not schedule.interval_seconds:
+        missed = [schedule.next_run_at]
+    else:
+        interval = timedelta(seconds=schedule.interval_seconds)
+        count = (now - schedule.next_run_at) // interval + 1
+        first = max(0, count - settings.SCHEDULER_MAX_CATCH_UP)
+        missed = [schedule.next_run_at + interval * index for index in range(first, count)]
+
+    if schedule.catch_up == CatchUpPolicy.ALL:
+        return missed
+    latest = missed[-1]
+    if schedule.catch_up == CatchUpPolicy.SKIP:
+        if (now - latest).total_seconds() > settings.SCHEDULER_MISFIRE_GRACE:
+            return []
+    return [latest]
+
+
+def advance(schedule: ScheduledTransfer, now: datetime) -> None:
+    """
+    Сдвигает `next_run_at` на первый момент после `now` или деактивирует разовое расписание.
+    """
+    if not schedule.interval_seconds:
+        schedule.is_active = False
+        return
+    interval = timedelta(seconds=schedule.interval_seconds)
+    skipped = (now - schedule.next_run_at) // interval + 1
+    schedule.next_run_at += interval * skipped
+
+
+async def claim_due_schedules() -> int:
+    """
+    Выбирает наступившие расписания и создает для них ожидающие запуски.
+
+    Возвращает:
+    - int: Количество обработанных расписаний.
+    """
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            result = await db.execute(
+                select(ScheduledTransfer)
+                .where(ScheduledTransfer.is_active.is_(True),
+                       ScheduledTransfer.next_run_at <= now)
+                .order_by(ScheduledTransfer.next_run_at)
+                .limit(settings.SCHEDULER_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            schedules = result.scalars().all()
+            for schedule in schedules:
+                runs = due_times(schedule, now)
+                if not runs:
+                    logger.info("Пропущен запуск расписания %d по политике skip", schedule.id)
+                db.add_all(ScheduledTransferRun(schedule_id=schedule.id, scheduled_for=run)
+                           for run in runs)
+                advance(schedule, now)
+    return len(schedules)
+
+
+async def execute_run(run_id: int) -> None:
+    """
+    Выполняет один ожидающий запуск.
+
+    Запуск блокируется через `SKIP LOCKED`, поэтому параллельные воркеры не
+    выполнят его дважды. Перевод проводится в точке сохранения: ошибка
+    перевода откатывает только ее, блокировка запуска сохраняется до
+    фиксации его статуса `failed`. Конфликты параллельных транзакций
+    оставляют запуск в `pending` для повтора.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ScheduledTransferRun, ScheduledTransfer)
+            .join(ScheduledTransfer, ScheduledTransfer.id == ScheduledTransferRun.schedule_id)
+            .where(ScheduledTransferRun.id == run_id,
+                   ScheduledTransferRun.status == "pending")
+            .with_for_update(of=ScheduledTransferRun, skip_locked=True)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return
+        run, schedule = row
+        schedule_id = schedule.id
+
+        try:
+            async with db.begin_nested():
+                transaction, event = await settle_transfer(
+                    db, schedule.sender_id, schedule.receiver_id, schedule.amount,
+                    schedule.currency
+                )
+            run.status = "completed"
+            run.transaction_id = transaction.id
+            run.executed_at = datetime.utcnow()
+            await db.commit()
+        except TransferError as error:
+            logger.warning("Запуск %d расписания %d не выполнен: %s",
+                           run_id, schedule_id, error.detail)
+            await db.execute(
+                update(ScheduledTransferRun)
+                .where(ScheduledTransferRun.id == run_id,
+                       ScheduledTransferRun.status == "pending")
+                .values(status="failed", error=error.detail, executed_at=datetime.utcnow())
+            )
+            await db.commit()
+            return
+        except DBAPIError as error:
+            await db.rollback()
+            if not is_retryable(error):
+                raise
+            logger.warning("Конфликт при выполнении запуска %d, повтор в следующем цикле", run_id)
+            return
+
+    transfer_committed(transaction, event)
+
+
+async def execute_pending_runs() -> int:
+    """
+    Выполняет пачку ожидающих запусков, не больше `SCHEDULER_CONCURRENCY` одновременно.
+
+    Возвращает:
+    - int: Количество взятых в работу запусков.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ScheduledTransferRun.id)
+            .where(ScheduledTransferRun.status == "pending")
+            .order_by(ScheduledTransferRun.id)
+            .limit(settings.SCHEDULER_BATCH_SIZE)
+        )
+        run_ids = result.scalars().all()
+
+    semaphore = asyncio.Semaphore(settings.SCHEDULER_CONCURRENCY)
+
+    async def bounded(run_id: int) -> None:
+        async with semaphore:
+            try:
+                await execute_run(run_id)
+            except Exception:
+                logger.exception("Ошибка выполнения запуска %d", run_id)
+
+    await asyncio.gather(*(bounded(run_id) for run_id in run_ids))
+    return len(run_ids)
+
+
+async def run_scheduler() -> None:
+    """
+    Основной цикл планировщика.
+
+    Если пачка заполнена полностью, следующий цикл начинается сразу,
+    иначе через `SCHEDULER_INTERVAL` секунд.
+    """
+    logger.info("Планировщик переводов запущен")
+    while True:
+        try:
+            claimed = await claim_due_schedules()
+            executed = await execute_pending_runs()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ошибка цикла планировщика")
+            claimed = executed = 0
+        if max(claimed, executed) < settings.SCHEDULER_BATCH_SIZE:
+            await asyncio.sleep(settings.SCHEDULER_INTERVAL)
@@ -1,11 +1,12 @@
 """
 Модуль для определения схем данных с использованием Pydantic.
 """
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from common.money import from_minor, validate_currency
 
 class TransactionStatus(str, Enum):
     """
@@ -20,7 +21,15 @@ class TransactionCreate(BaseModel):
     Класс для создания транзакции.
     """
     receiver_id: int
-    amount: Decimal
+    amount: Decimal = Field(..., gt=0)
+    currency: Optional[str] = None
+
+    @field_validator("currency")
+    def check_currency(cls, value):
+        """
+        Проверяет, что валюта поддерживается.
+        """
+        return value if value is None else validate_currency(value)
 
 class TransactionResponse(BaseModel):
     """
@@ -29,9 +38,20 @@ class TransactionResponse(BaseModel):
     id: int
     sender_id: int
     receiver_id: int
+    currency: str
     amount: Decimal
     status: TransactionStatus
     created_at: datetime
+    parent_id: Optional[int] = None
+
+    @field_validator("amount", mode="before")
+    def amount_from_minor_units(cls, value, info: ValidationInfo):
+        """
+        Переводит сумму из минимальных единиц валюты, в которых она хранится в БД.
+        """
+        if isinstance(value, int):
+            return from_minor(value, info.data["currency"])
+        return value
 
     class Config:
         """
@@ -39,6 +59,64 @@ class TransactionResponse(BaseModel):
         """
         orm_mode = True
 
+class LedgerEntryResponse(BaseModel):
+    """
+    Класс для представления проводки по счету.
+    """
+    id: int
+    transaction_id: int
+    currency: str
+    amount: Decimal
+    balance_after: Decimal
+    created_at: datetime
+
+    @field_validator("amount", "balance_after", mode="before")
+    def from_minor_units(cls, value, info: ValidationInfo):
+        """
+        Переводит суммы из минимальных единиц валюты, в которых они хранятся в БД.
+        """
+        if isinstance(value, int):
+            return from_minor(value, info.data["currency"])
+        return value
+
+    class Config:
+        """
+        Конфигурация для модели LedgerEntryResponse.
+        """
+        orm_mode = True
+
+class LedgerPage(BaseModel):
+    """
+    Класс для представления страницы проводок.
+    """
+    items: List[LedgerEntryResponse]
+    next_cursor: Optional[str] = None
+
+class BalanceResponse(BaseModel):
+    """
+    Класс для представления баланса счета на момент времени.
+    """
+    currency: str
+    balance: Decimal
+    at: datetime
+
+    @field_validator("balance", mode="before")
+    def balance_from_minor_units(cls, value, info: ValidationInfo):
+        """
+        Переводит баланс из минимальных единиц валюты, в которых он хранится в БД.
+        """
+        if isinstance(value, int):
+            return from_minor(value, info.data["currency"])
+        return value
+
+class ReversalCreate(BaseModel):
+    """
+    Класс для возврата транзакции.
+
+    Если сумма не указана, возвращается весь невозвращенный остаток.
+    """
+    amount: Optional[Decimal] = Field(None, gt=0)
+
 class TransactionFilter(BaseModel):
     """
     Класс для фильтрации транзакций.
@@ -46,3 +124,86 @@ class TransactionFilter(BaseModel):
     start_date: Optional[datetime]
     end_date: Optional[datetime]
     status: Optional[TransactionStatus]
+
+class CatchUpPolicy(str, Enum):
+    """
+    Класс для политик навёрстывания пропущенных запусков расписания.
+    """
+    SKIP = "skip"
+    ONCE = "once"
+    ALL = "all"
+
+class ScheduleCreate(BaseModel):
+    """
+    Класс для создания запланированного перевода.
+    """
+    receiver_id: int
+    amount: Decimal = Field(..., gt=0)
+    currency: Optional[str] = None
+    start_at: datetime
+    interval_seconds: Optional[int] = Field(None, ge=60)
+    catch_up: CatchUpPolicy = CatchUpPolicy.ONCE
+
+    @field_validator("currency")
+    def check_currency(cls, value):
+        """
+        Проверяет, что валюта поддерживается.
+        """
+        return value if value is None else validate_currency(value)
+
+    @field_validator("start_at")
+    def to_naive_utc(cls, value):
+        """
+        Приводит время к UTC без часового пояса, как оно хранится в БД.
+        """
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class ScheduleResponse(BaseModel):
+    """
+    Класс для представления запланированного перевода.
+    """
+    id: int
+    sender_id: int
+    receiver_id: int
+    currency: str
+    amount: Decimal
+    interval_seconds: Optional[int]
+    next_run_at: datetime
+    catch_up: CatchUpPolicy
+    is_active: bool
+    created_at: datetime
+
+    @field_validator("amount", mode="before")
+    def amount_from_minor_units(cls, value, info: ValidationInfo):
+        """
+        Переводит сумму из минимальных единиц валюты, в которых она хранится в БД.
+        """
+        if isinstance(value, int):
+            return from_minor(value, info.data["currency"])
+        return value
+
+    class Config:
+        """
+        Конфигурация для модели ScheduleResponse.
+        """
+        orm_mode = True
+
+class ScheduleRunResponse(BaseModel):
+    """
+    Класс для представления запуска запланированного перевода.
+    """
+    id: int
+    schedule_id: int
+    scheduled_for: datetime
+    status: str
+    transaction_id: Optional[int]
+    error: Optional[str]
+    executed_at: Optional[datetime]
+
+    class Config:
+        """
+        Конфигурация для модели ScheduleRunResponse.
+        """
+        orm_mode = True
@@ -0,0 +1,238 @@
+"""
+Проведение переводов между счетами.
+
+Общая логика для API переводов, возвратов и планировщика: блокирует счета,
+проверяет перевод, изменяет балансы и записывает транзакцию, проводки и
+событие в outbox.
+Фиксацию транзакции БД выполняет вызывающий код.
+"""
+import logging
+from typing import Optional, Tuple
+from fastapi import status
+from sqlalchemy import func
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app import events, ledger
+from app.limits import LimitExceeded, registry as limits
+from app.schemas import TransactionStatus
+from common.models.outbox import OutboxEvent
+from common.models.transaction import Transaction
+from common.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Коды SQLSTATE ошибок сериализации и взаимоблокировки.
+RETRYABLE_SQLSTATES = ("40001", "40P01")
+
+
+class TransferError(Exception):
+    """
+    Ошибка проведения перевода.
+
+    Атрибуты:
+    - detail (str): Описание ошибки для клиента.
+    - status_code (int): HTTP-код ответа.
+    """
+
+    def __init__(self, detail: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class AlreadyReversed(TransferError):
+    """
+    Ошибка возврата транзакции, которая уже возвращена полностью.
+    """
+
+
+def is_retryable(error: DBAPIError) -> bool:
+    """
+    Проверяет, что ошибка БД вызвана конфликтом параллельных транзакций.
+    """
+    return getattr(error.orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
+
+async def lock_accounts(db: AsyncSession, *user_ids: int) -> dict:
+    """
+    Блокирует счета пользователей (`SELECT ... FOR UPDATE`) в порядке возрастания ID.
+
+    Единый порядок блокировок исключает взаимоблокировки встречных переводов.
+
+    Возвращает:
+    - dict: Пользователи по ID с актуальными балансами.
+    """
+    result = await db.execute(
+        select(User)
+        .where(User.id.in_(sorted(set(user_ids))))
+        .order_by(User.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return {user.id: user for user in result.scalars()}
+
+
+async def settle_transfer(db: AsyncSession, sender_id: int, receiver_id: int,
+                          amount: int, currency: str) -> Tuple[Transaction, dict]:
+    """
+    Проводит перевод в текущей транзакции БД.
+
+    Параметры:
+    - db (AsyncSession): Сессия базы данных.
+    - sender_id (int): ID отправителя.
+    - receiver_id (int): ID получателя.
+    - amount (int): Сумма в минимальных единицах валюты.
+    - currency (str): Валюта перевода.
+
+    Возвращает:
+    - Tuple[Transaction, dict]: Созданная транзакция и событие о переводе; после
+      фиксации их нужно передать в `transfer_committed`.
+
+    Исключения:
+    - TransferError: Если перевод невозможен.
+    """
+    if sender_id == receiver_id:
+        logger.warning("Пользователь %d пытается перевести средства самому себе", sender_id)
+        raise TransferError("Нельзя перевести средства самому себе")
+
+    if amount <= 0:
+        raise TransferError("Сумма перевода должна быть положительной")
+
+    accounts = await lock_accounts(db, sender_id, receiver_id)
+    sender = accounts.get(sender_id)
+    receiver = accounts.get(receiver_id)
+    if sender is None:
+        logger.warning("Отправитель с ID %d не найден", sender_id)
+        raise TransferError("Отправитель не найден", status.HTTP_404_NOT_FOUND)
+    if receiver is None:
+        logger.warning("Получатель с ID %d не найден", receiver_id)
+        raise TransferError("Получатель не найден", status.HTTP_404_NOT_FOUND)
+
+    if sender.currency != currency:
+        logger.warning("Валюта перевода %s не совпадает с валютой счета %s",
+                       currency, sender.currency)
+        raise TransferError("Валюта перевода не совпадает с валютой счета")
+
+    if receiver.currency != currency:
+        logger.warning("Валюты счетов %s и %s не совпадают",
+                       sender.username, receiver.username)
+        raise TransferError("Валюты счетов отправителя и получателя не совпадают")
+
+    if sender.balance < amount:
+        logger.warning("Недостаточно средств у пользователя %s", sender.username)
+        raise TransferError("Недостаточно средств")
+
+    try:
+        await limits.check(db, sender.id, currency, amount)
+    except LimitExceeded as error:
+        logger.warning("Лимит переводов пользователя %s: %s", sender.username, error)
+        raise TransferError(str(error))
+
+    return await post_transfer(db, sender, receiver, amount, currency)
+
+
+async def settle_reversal(db: AsyncSession, transaction_id: int, amount: Optional[int] = None,
+                          allow_overdraft: bool = False) -> Tuple[Transaction, dict]:
+    """
+    Проводит полный или частичный возврат перевода в текущей транзакции БД.
+
+    Создает компенсирующую транзакцию от получателя к отправителю со ссылкой
+    на исходную (`parent_id`). Исходная транзакция блокируется, поэтому
+    параллельные возвраты одного перевода не превысят его сумму. Счета
+    блокируются через `lock_accounts` в порядке возрастания ID, а не в
+    порядке отправитель/получатель, поэтому возврат (перевод в обратную
+    сторону) не образует взаимоблокировку со встречными переводами.
+
+    Параметры:
+    - db (AsyncSession): Сессия базы данных.
+    - transaction_id (int): ID исходной транзакции.
+    - amount (Optional[int]): Сумма возврата в минимальных единицах; по умолчанию
+      весь невозвращенный остаток.
+    - allow_overdraft (bool): Разрешить отрицательный баланс получателя, если он
+      уже потратил средства (для устранения последствий инцидентов).
+
+    Возвращает:
+    - Tuple[Transaction, dict]: Компенсирующая транзакция и событие о ней.
+
+    Исключения:
+    - TransferError: Если возврат невозможен.
+    """
+    result = await db.execute(
+        select(Transaction).where(Transaction.id == transaction_id).with_for_update()
+    )
+    original = result.scalar_one_or_none()
+    if original is None:
+        raise TransferError("Транзакция не найдена", status.HTTP_404_NOT_FOUND)
+    if original.parent_id is not None:
+        raise TransferError("Нельзя вернуть возврат")
+    if original.status != TransactionStatus.COMPLETED:
+        raise TransferError("Можно вернуть только завершенную транзакцию")
+
+    result = await db.execute(
+        select(func.coalesce(func.sum(Transaction.amount), 0))
+        .where(Transaction.parent_id == original.id)
+    )
+    remaining = original.amount - int(result.scalar_one())
+    if remaining == 0:
+        raise AlreadyReversed("Транзакция уже возвращена полностью")
+    if amount is None:
+        amount = remaining
+    if amount <= 0 or amount > remaining:
+        logger.warning("Сумма возврата %s превышает остаток %d по транзакции %d",
+                       amount, remaining, original.id)
+        raise TransferError("Сумма возврата должна быть положительной и не больше невозвращенного остатка")
+
+    accounts = await lock_accounts(db, original.sender_id, original.receiver_id)
+    sender = accounts[original.receiver_id]
+    receiver = accounts[original.sender_id]
+    if sender.balance < amount and not allow_overdraft:
+        logger.warning("Недостаточно средств для возврата у пользователя %s", sender.username)
+        raise TransferError("Недостаточно средств для возврата")
+
+    return await post_transfer(db, sender, receiver, amount, original.currency,
+                               parent_id=original.id)
+
+
+async def post_transfer(db: AsyncSession, sender: User, receiver: User, amount: int,
+                        currency: str, parent_id: Optional[int] = None) -> Tuple[Transaction, dict]:
+    """
+    Записывает проверенный перевод между заблокированными счетами.
+
+    Возвращает:
+    - Tuple[Transaction, dict]: Созданная транзакция и событие о ней.
+    """
+    transaction = Transaction(
+        sender_id=sender.id,
+        receiver_id=receiver.id,
+        amount=amount,
+        currency=currency,
+        status=TransactionStatus.COMPLETED,
+        parent_id=parent_id
+    )
+    sender.balance -= amount
+    receiver.balance += amount
+    db.add(transaction)
+    await db.flush()
+    await ledger.write_entries(db, transaction, sender, receiver)
+
+    event = events.transfer_event(transaction, sender, receiver)
+    topic = "transfer.reversed" if parent_id else "transfer.completed"
+    db.add(OutboxEvent(topic=topic, payload=event))
+    await events.broker.notify(db, event)
+
+    logger.info("Перевод проведен: %s -> %s, сумма: %d %s",
+                sender.username, receiver.username, amount, currency)
+    return transaction, event
+
+
+def transfer_committed(transaction: Transaction, event: dict) -> None:
+    """
+    Действия после фиксации перевода: учет в окнах лимитов и публикация события.
+
+    Возвраты не расходуют лимиты исходящих переводов.
+    """
+    if transaction.parent_id is None:
+        limits.record(transaction.sender_id, transaction.id, transaction.amount,
+                      transaction.created_at)
+    events.broker.publish(event)
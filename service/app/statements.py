@@ -0,0 +1,270 @@
+"""
+Выписки по счетам за календарный месяц.
+
+Запуск расчета итогов:
+    python -m app.statements [--period 2025-01]
+
+Итоги закрытого месяца (входящий и исходящий балансы, обороты и количество
+проводок) рассчитываются одним запросом по `ledger_entries` для всех счетов
+с проводками за период и сохраняются в `statement_summaries`. По
+умолчанию рассчитывается предыдущий месяц; команду удобно запускать по cron в
+начале месяца, повторный запуск пересчитывает итоги.
+
+Выписка берет балансы из итогов, а если их нет (текущий месяц или итоги еще
+не рассчитаны) — из `balance_after` ближайших проводок. Проводки периода
+читаются по диапазону индекса `(account_id, created_at, id)` страницами по
+`STREAM_BATCH_SIZE` и передаются клиенту потоком. Каждая страница читается в
+отдельной короткой сессии, поэтому медленный клиент не удерживает соединение
+пула и снимок БД на все время передачи.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import AsyncIterator, Optional, Tuple
+from sqlalchemy import Date, case, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app import ledger
+from app.database import AsyncSessionLocal
+from common.logging_config import setup_logging
+from common.models.ledger import LedgerEntry
+from common.models.statement import StatementSummary
+from common.models.user import User
+from common.money import from_minor
+
+logger = logging.getLogger(__name__)
+
+# Количество проводок, читаемых из БД за раз.
+STREAM_BATCH_SIZE = 500
+
+
+class StatementFormat(str, Enum):
+    """
+    Класс для форматов выписки.
+    """
+    CSV = "csv"
+    JSON = "json"
+
+
+def parse_period(value: str) -> date:
+    """
+    Разбирает период вида `2025-01`.
+
+    Возвращает:
+    - date: Первый день месяца.
+
+    Исключения:
+    - ValueError: Если период некорректен.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"Некорректный период: {value}, ожидается ГГГГ-ММ")
+
+
+def period_bounds(period_start: date) -> Tuple[datetime, datetime]:
+    """
+    Границы месяца `[начало, конец)` в UTC.
+    """
+    start = datetime.combine(period_start, datetime.min.time())
+    end = datetime.combine((period_start + timedelta(days=32)).replace(day=1),
+                           datetime.min.time())
+    return start, end
+
+
+async def summarize(db: AsyncSession, period_start: date) -> int:
+    """
+    Рассчитывает и сохраняет итоги месяца по всем счетам с проводками.
+
+    Входящий и исходящий балансы берутся из первой и последней проводки
+    периода через `DISTINCT ON`, обороты — агрегатом по счету. Счет ведется в
+    одной валюте (перевод возможен только между счетами в валюте перевода),
+    поэтому итоги группируются по счету, а валюта берется из счета.
+
+    Возвращает:
+    - int: Количество рассчитанных счетов.
+    """
+    start, end = period_bounds(period_start)
+    in_period = (LedgerEntry.created_at >= start, LedgerEntry.created_at < end)
+    first = (
+        select(LedgerEntry.account_id,
+               (LedgerEntry.balance_after - LedgerEntry.amount).label("balance"))
+        .where(*in_period)
+        .distinct(LedgerEntry.account_id)
+        .order_by(LedgerEntry.account_id, LedgerEntry.created_at, LedgerEntry.id)
+        .subquery()
+    )
+    last = (
+        select(LedgerEntry.account_id, LedgerEntry.balance_after.label("balance"))
+        .where(*in_period)
+        .distinct(LedgerEntry.account_id)
+        .order_by(LedgerEntry.account_id, LedgerEntry.created_at.desc(),
+                  LedgerEntry.id.desc())
+        .subquery()
+    )
+    turnover = (
+        select(
+            LedgerEntry.account_id,
+            func.coalesce(func.sum(case((LedgerEntry.amount < 0, -LedgerEntry.amount))),
+                          0).label("debit"),
+            func.coalesce(func.sum(case((LedgerEntry.amount > 0, LedgerEntry.amount))),
+                          0).label("credit"),
+            func.count().label("entries"),
+        )
+        .where(*in_period)
+        .group_by(LedgerEntry.account_id)
+        .subquery()
+    )
+    totals = (
+        select(turnover.c.account_id, literal(period_start, Date), User.currency,
+               first.c.balance, last.c.balance, turnover.c.debit, turnover.c.credit,
+               turnover.c.entries, func.now())
+        .join(first, first.c.account_id == turnover.c.account_id)
+        .join(last, last.c.account_id == turnover.c.account_id)
+        .join(User, User.id == turnover.c.account_id)
+    )
+    statement = insert(StatementSummary).from_select(
+        ["account_id", "period_start", "currency", "opening_balance", "closing_balance",
+         "total_debit", "total_credit", "entry_count", "computed_at"],
+        totals,
+    )
+    result = await db.execute(statement.on_conflict_do_update(
+        index_elements=[StatementSummary.account_id, StatementSummary.period_start],
+        set_={column: statement.excluded[column]
+              for column in ("currency", "opening_balance", "closing_balance",
+                             "total_debit", "total_credit", "entry_count", "computed_at")},
+    ))
+    return result.rowcount
+
+
+async def opening_balance(db: AsyncSession, user: User,
+                          period_start: date) -> Tuple[int, Optional[int]]:
+    """
+    Входящий и, если известен, исходящий баланс счета за период.
+
+    Возвращает:
+    - Tuple[int, Optional[int]]: Балансы в минимальных единицах; исходящий
+      баланс равен None, если итоги периода еще не рассчитаны.
+    """
+    summary = await db.get(StatementSummary, (user.id, period_start))
+    if summary is not None:
+        return summary.opening_balance, summary.closing_balance
+    start, _ = period_bounds(period_start)
+    return await ledger.balance_at(db, user, start, inclusive=False), None
+
+
+async def stream_statement(user: User, period_start: date,
+                           statement_format: StatementFormat) -> AsyncIterator[str]:
+    """
+    Формирует выписку потоком в CSV или JSON.
+
+    Использует собственные сессии: зависимости запроса закрываются до того,
+    как начнется передача потокового ответа. Ошибка после начала передачи
+    уже не может изменить статус ответа, поэтому она пишется в журнал, а
+    клиент получает оборванную выписку.
+    """
+    try:
+        async for chunk in _statement_chunks(user, period_start, statement_format):
+            yield chunk
+    except Exception:
+        logger.exception("Выписка пользователя %s за %s прервана",
+                         user.username, period_start.strftime("%Y-%m"))
+        raise
+
+
+async def _statement_chunks(user: User, period_start: date,
+                            statement_format: StatementFormat) -> AsyncIterator[str]:
+    start, end = period_bounds(period_start)
+    currency = user.currency
+    async with AsyncSessionLocal() as db:
+        opening, closing = await opening_balance(db, user, period_start)
+    balance = opening
+
+    if statement_format == StatementFormat.CSV:
+        yield _csv_row("type", "created_at", "transaction_id", "amount", "balance")
+        yield _csv_row("opening", start.isoformat(), "", "",
+                       from_minor(opening, currency))
+    else:
+        yield (f'{{"period": "{period_start.strftime("%Y-%m")}", "currency": "{currency}", '
+               f'"opening_balance": "{from_minor(opening, currency)}", "entries": [')
+
+    after = None
+    first = True
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                ledger.entries_query(user.id, start, end, after).limit(STREAM_BATCH_SIZE)
+            )
+            entries = result.scalars().all()
+        for entry in entries:
+            balance = entry.balance_after
+            if statement_format == StatementFormat.CSV:
+                yield _csv_row("entry", entry.created_at.isoformat(), entry.transaction_id,
+                               from_minor(entry.amount, currency),
+                               from_minor(entry.balance_after, currency))
+            else:
+                yield ("" if first else ", ") + json.dumps({
+                    "created_at": entry.created_at.isoformat(),
+                    "transaction_id": entry.transaction_id,
+                    "amount": str(from_minor(entry.amount, currency)),
+                    "balance_after": str(from_minor(entry.balance_after, currency)),
+                })
+            first = False
+        if len(entries) < STREAM_BATCH_SIZE:
+            break
+        after = (entries[-1].created_at, entries[-1].id)
+
+    closing = balance if closing is None else closing
+    if statement_format == StatementFormat.CSV:
+        yield _csv_row("closing", end.isoformat(), "", "", from_minor(closing, currency))
+    else:
+        yield f'], "closing_balance": "{from_minor(closing, currency)}"}}\n'
+
+
+def _csv_row(*values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+async def run_summaries(period_start: date) -> None:
+    """
+    Рассчитывает итоги месяца в отдельной транзакции БД.
+    """
+    async with AsyncSessionLocal() as db:
+        accounts = await summarize(db, period_start)
+        await db.commit()
+    logger.info("Итоги за %s рассчитаны для счетов: %d",
+                period_start.strftime("%Y-%m"), accounts)
+
+
+def main() -> None:
+    """
+    Точка входа расчета итогов выписок.
+    """
+    parser = argparse.ArgumentParser(description="Расчет итогов выписок за месяц")
+    parser.add_argument("--period", help="месяц в формате ГГГГ-ММ (по умолчанию предыдущий)")
+    args = parser.parse_args()
+
+    if args.period:
+        try:
+            period_start = parse_period(args.period)
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        period_start = (datetime.utcnow().date().replace(day=1) - timedelta(days=1)).replace(day=1)
+    if period_bounds(period_start)[1] > datetime.utcnow():
+        parser.error("итоги рассчитываются только за закончившийся месяц")
+
+    setup_logging()
+    asyncio.run(run_summaries(period_start))
+
+
+if __name__ == "__main__":
+    main()
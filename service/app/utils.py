@@ -8,8 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import AsyncSessionLocal
 from app.config import settings
+from app.jwks import JWKSCache
 from common.models.user import User
 
+jwks_cache = JWKSCache(settings.JWKS_URL, settings.JWKS_CACHE_TTL) if settings.JWKS_URL else None
+
 async def get_db():
     """
     Асинхронный генератор для получения сессии базы данных.
@@ -23,6 +26,30 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
+async def decode_token(token: str) -> dict:
+    """
+    Проверка подписи и срока действия токена доступа.
+
+    Для HS-алгоритмов используется `JWT_SECRET`, для асимметричных — открытый
+    ключ из JWKS сервиса аутентификации (`JWKS_URL`), закэшированный локально.
+
+    Параметры:
+    - token (str): JWT токен.
+
+    Возвращает:
+    - dict: Содержимое токена.
+
+    Исключения:
+    - jwt.PyJWTError: Если токен недействителен или истек.
+    """
+    if settings.JWT_ALGORITHM.startswith("HS"):
+        key = settings.JWT_SECRET
+    else:
+        if jwks_cache is None:
+            raise jwt.InvalidTokenError("Не задан JWKS_URL")
+        key = await jwks_cache.get_key(jwt.get_unverified_header(token).get("kid"))
+    return jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
+
 async def get_current_user(token: str, db: AsyncSession = Depends(get_db)) -> User:
     """
     Получение текущего пользователя на основе токена JWT.
@@ -41,8 +68,7 @@ async def get_current_user(token: str, db: AsyncSession = Depends(get_db)) -> Us
     - HTTPException: Если токен недействителен, истек или пользователь не найден.
     """
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET,
-                             algorithms=settings.JWT_ALGORITHM)
+        payload = await decode_token(token)
         username = payload.get("sub")
         exp_timestamp = payload.get("exp")
 